@@ -0,0 +1,46 @@
+# session_store.py
+"""
+Cached database sessions that keep working when the cache is down.
+
+Django's cached_db store reads sessions from the cache but writes the cache
+without catching errors, so an unreachable Redis would turn every request
+with a session into a 500. The database stays the source of truth, so cache
+errors are logged and the database is used instead.
+"""
+import logging
+
+import redis
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+logger = logging.getLogger('extractor')
+
+class SessionStore(CachedDBStore):
+    """cached_db SessionStore falling back to the database on Redis errors"""
+
+    def load(self):
+        try:
+            return super().load()
+        except redis.RedisError as e:
+            logger.warning(f"Session cache unavailable, loading session from the database: {str(e)}")
+            return DBStore.load(self)
+
+    def exists(self, session_key):
+        try:
+            return super().exists(session_key)
+        except redis.RedisError as e:
+            logger.warning(f"Session cache unavailable, checking session in the database: {str(e)}")
+            return DBStore.exists(self, session_key)
+
+    def save(self, must_create=False):
+        # The database is written first, so only the cache copy can be missing
+        try:
+            super().save(must_create)
+        except redis.RedisError as e:
+            logger.warning(f"Session cache unavailable, session saved to the database only: {str(e)}")
+
+    def delete(self, session_key=None):
+        try:
+            super().delete(session_key)
+        except redis.RedisError as e:
+            logger.warning(f"Session cache unavailable, session deleted from the database only: {str(e)}")
@@ -101,13 +101,45 @@
 
 from celery import shared_task
 import logging
+import redis
 from .models import UploadedPDF, ExtractedData
 from .utils.extractor import extract_pdf_fields
+from .utils.update_excel import update_master_excel
+from .utils.redis_client import get_redis_client
 from django.conf import settings
 import os
 
 logger = logging.getLogger('extractor.tasks')
 
+# Set while a master Excel regeneration is queued, so uploads finishing
+# within the countdown share a single regeneration
+MASTER_EXCEL_PENDING_KEY = 'extractor:master_excel_pending'
+MASTER_EXCEL_COUNTDOWN = 30
+
+@shared_task
+def regenerate_master_excel():
+    """Celery task rebuilding the master Excel files from the database"""
+    # Clear the flag first, so uploads finishing during the rebuild queue another one
+    try:
+        get_redis_client().delete(MASTER_EXCEL_PENDING_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Could not clear pending master Excel flag: {str(e)}")
+    return update_master_excel()
+
+def schedule_master_excel_update():
+    """
+    Queue a master Excel regeneration unless one is already pending.
+    Returns True if a new regeneration was queued.
+    """
+    try:
+        if not get_redis_client().set(MASTER_EXCEL_PENDING_KEY, 1, nx=True, ex=MASTER_EXCEL_COUNTDOWN * 2):
+            return False
+    except redis.RedisError as e:
+        # Without the flag every upload queues its own regeneration
+        logger.warning(f"Could not set pending master Excel flag: {str(e)}")
+    regenerate_master_excel.apply_async(countdown=MASTER_EXCEL_COUNTDOWN)
+    return True
+
 @shared_task(bind=True)
 def process_pdf_file(self, uploaded_pdf_id, vendor_config):
     """Celery task for PDF extraction, with robust fallback/status handling"""
@@ -170,13 +202,19 @@ def process_pdf_file(self, uploaded_pdf_id, vendor_config):
 
         uploaded_pdf.status = 'COMPLETED'
         uploaded_pdf.save()
-        
-        # Update master Excel file with the new data (restore original functionality)
+
+        # Record page numbers for the master Excel regeneration
+        try:
+            from .utils.update_excel_with_pages import record_extraction_pages
+            record_extraction_pages(extracted_data)
+        except Exception as e:
+            logger.error(f"Error recording extraction pages: {str(e)}", exc_info=True)
+
+        # Update master Excel file with the new data in the background
         try:
-            from .utils.update_excel import update_master_excel
-            update_master_excel()
+            schedule_master_excel_update()
         except Exception as e:
-            logger.error(f"Error updating master Excel file: {str(e)}", exc_info=True)
+            logger.error(f"Error scheduling master Excel update: {str(e)}", exc_info=True)
 
         # Phase 4: Finalizing (95%)
         self.update_state(state='PROGRESS', meta={
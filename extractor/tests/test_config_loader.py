@@ -0,0 +1,60 @@
+"""
+Unit tests for find_vendor_config
+
+These tests check loaded configs are cached until the file changes and that
+placeholder configs are not cached.
+"""
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from extractor.utils.config_loader import find_vendor_config
+
+class FindVendorConfigTest(SimpleTestCase):
+    """Test cases for the vendor config lookup"""
+
+    def setUp(self):
+        find_vendor_config.cache_clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.media_root = os.path.join(self.temp_dir.name, 'media')
+        self.base_dir = os.path.join(self.temp_dir.name, 'base')
+        os.makedirs(os.path.join(self.media_root, 'vendor_configs'))
+        os.makedirs(os.path.join(self.base_dir, 'extractor', 'vendor_configs'))
+        self.settings = SimpleNamespace(MEDIA_ROOT=self.media_root, BASE_DIR=self.base_dir)
+        self.vendor = SimpleNamespace(
+            name='POSCO',
+            config_file=SimpleNamespace(name='vendor_configs/posco.json'),
+        )
+        self.config_path = os.path.join(self.media_root, 'vendor_configs', 'posco.json')
+
+    def write_config(self, config, mtime_ns):
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f)
+        # Set explicitly, as two writes can share a timestamp
+        os.utime(self.config_path, ns=(mtime_ns, mtime_ns))
+
+    def test_edited_config_is_reloaded(self):
+        """An edited config file is read again"""
+        self.write_config({'vendor_name': 'old'}, 1_000_000_000)
+        config, path = find_vendor_config(self.vendor, self.settings)
+        self.assertEqual(config, {'vendor_name': 'old'})
+        self.assertEqual(path, self.config_path)
+
+        self.write_config({'vendor_name': 'new'}, 2_000_000_000)
+        config, path = find_vendor_config(self.vendor, self.settings)
+        self.assertEqual(config, {'vendor_name': 'new'})
+
+    def test_placeholder_is_not_cached(self):
+        """A config added after a placeholder was returned is used"""
+        config, path = find_vendor_config(self.vendor, self.settings)
+        self.assertEqual(config['vendor_name'], 'POSCO')
+        self.assertEqual(path, os.path.join(self.base_dir, 'extractor', 'vendor_configs', 'posco.json'))
+
+        self.write_config({'vendor_name': 'uploaded'}, 1_000_000_000)
+        config, path = find_vendor_config(self.vendor, self.settings)
+        self.assertEqual(config, {'vendor_name': 'uploaded'})
+        self.assertEqual(path, self.config_path)
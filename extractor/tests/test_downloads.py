@@ -7,14 +7,18 @@ import os
 import io
 import tempfile
 import zipfile
+import warnings
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase, Client, RequestFactory
+from openpyxl import load_workbook
+
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.urls import reverse
 from django.contrib.messages.storage.fallback import FallbackStorage
-from django.http import FileResponse
+from django.http import StreamingHttpResponse
 
 from extractor.models import UploadedPDF, ExtractedData, Vendor
+from extractor.views.core import download_pdfs_with_excel
 from extractor.views.downloads import download_all_pdfs_package
 
 class DownloadAllPdfsPackageTest(TestCase):
@@ -130,10 +134,159 @@ class DownloadAllPdfsPackageTest(TestCase):
         response = download_all_pdfs_package(request)
         
         # Check response
-        self.assertIsInstance(response, FileResponse)
+        self.assertIsInstance(response, StreamingHttpResponse)
         self.assertEqual(response['Content-Type'], 'application/zip')
         self.assertTrue('attachment; filename=' in response['Content-Disposition'])
 
+class StreamedPackageTest(TestCase):
+    """
+    Test cases for the archive streamed by download_all_pdfs_package
+    """
+    
+    def setUp(self):
+        """Set up a PDF on disk and a separate directory for temporary files"""
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        os.makedirs(os.path.join(media_root.name, 'uploads'))
+        self.pdf_content = b'%PDF-1.4 test content' * 100
+        with open(os.path.join(media_root.name, 'uploads', 'cert.pdf'), 'wb') as f:
+            f.write(self.pdf_content)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        # The view's temporary directory is created in here
+        temp_root = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_root.cleanup)
+        self.temp_root = temp_root.name
+        tempdir_patch = patch('tempfile.tempdir', self.temp_root)
+        tempdir_patch.start()
+        self.addCleanup(tempdir_patch.stop)
+        
+        vendor = Vendor.objects.create(name="Test Vendor")
+        pdf = UploadedPDF.objects.create(
+            file="uploads/cert.pdf",
+            vendor=vendor,
+            status="COMPLETED",
+            file_size=len(self.pdf_content)
+        )
+        ExtractedData.objects.create(
+            vendor=vendor,
+            pdf=pdf,
+            field_key="PLATE_NO",
+            field_value="P1",
+            page_number=1
+        )
+        
+        self.factory = RequestFactory()
+    
+    def get_response(self):
+        """Call the view with messages support"""
+        request = self.factory.get(reverse('download_all_pdfs_package'))
+        setattr(request, 'session', 'session')
+        setattr(request, '_messages', FallbackStorage(request))
+        return download_all_pdfs_package(request)
+    
+    def test_streamed_archive(self):
+        """The streamed archive is valid and stores the PDFs uncompressed"""
+        response = self.get_response()
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = b''.join(response.streaming_content)
+        response.close()
+        
+        with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(sorted(zip_file.namelist()), [
+                'README.txt',
+                'all_extracted_data.xlsx',
+                'extracted_data.txt',
+                'pdfs/001_cert.pdf',
+                'test.txt',
+                'test.xlsx',
+            ])
+            pdf_info = zip_file.getinfo('pdfs/001_cert.pdf')
+            self.assertEqual(pdf_info.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zip_file.read(pdf_info), self.pdf_content)
+            self.assertEqual(zip_file.getinfo('README.txt').compress_type, zipfile.ZIP_DEFLATED)
+        
+        self.assertEqual(os.listdir(self.temp_root), [])
+    
+    def test_unstarted_response_is_cleaned_up(self):
+        """Closing a response that was never streamed removes the temporary files"""
+        response = self.get_response()
+        self.assertNotEqual(os.listdir(self.temp_root), [])
+        
+        # Removed by the response, not implicitly by the garbage collector
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            response.close()
+        self.assertEqual(os.listdir(self.temp_root), [])
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+class PdfsWithExcelTest(TestCase):
+    """
+    Test cases for the all-PDFs package of download_pdfs_with_excel
+    """
+    
+    def setUp(self):
+        """Set up two PDFs from different vendors, one with an extracted page"""
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        for relative_path in ('uploads/cert_a.pdf', 'uploads/cert_b.pdf', 'extracted/cert_a_page_1.pdf'):
+            path = os.path.join(media_root.name, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'%PDF-1.4 ' + relative_path.encode())
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        posco = Vendor.objects.create(name="POSCO")
+        jfe = Vendor.objects.create(name="JFE")
+        pdf_a = UploadedPDF.objects.create(file="uploads/cert_a.pdf", vendor=posco, file_size=10)
+        pdf_b = UploadedPDF.objects.create(file="uploads/cert_b.pdf", vendor=jfe, file_size=10)
+        for pdf, field_key, field_value in (
+            (pdf_a, 'PLATE_NO', 'P1'),
+            (pdf_a, 'HEAT_NO', 'H1'),
+            (pdf_a, 'PLATE_NO', 'P1-later'),
+            (pdf_a, 'OTHER', 'x'),
+            (pdf_b, 'TEST_CERT_NO', 'C2'),
+        ):
+            ExtractedData.objects.create(vendor=pdf.vendor, pdf=pdf, field_key=field_key, field_value=field_value)
+        
+        self.factory = RequestFactory()
+    
+    def test_summary(self):
+        """The summary lists each PDF's key fields, field count and extracted pages"""
+        request = self.factory.get(reverse('download_pdfs_with_excel'))
+        setattr(request, 'session', 'session')
+        setattr(request, '_messages', FallbackStorage(request))
+        
+        # The PDFs with their vendors, and the extracted data of all of them
+        with self.assertNumQueries(2):
+            response = download_pdfs_with_excel(request)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = b''.join(response.streaming_content)
+        response.close()
+        
+        with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertIn('cert_a/original/cert_a.pdf', zip_file.namelist())
+            self.assertIn('cert_a/extracted_pdfs/cert_a_page_1.pdf', zip_file.namelist())
+            wb = load_workbook(io.BytesIO(zip_file.read('extraction_summary.xlsx')), read_only=True)
+            rows = list(wb['Sheet1'].iter_rows(values_only=True))
+            wb.close()
+        
+        self.assertEqual(rows[0], (
+            'PDF File', 'Vendor', 'PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO',
+            'Uploaded At', 'Fields Found', 'Extracted Pages',
+        ))
+        summary = {row[0]: row[1:5] + row[6:] for row in rows[1:]}
+        self.assertEqual(summary, {
+            'cert_a.pdf': ('POSCO', 'P1', 'H1', None, 4, 1),
+            'cert_b.pdf': ('JFE', None, None, 'C2', 1, 0),
+        })
+
 def run_tests():
     """Run the tests"""
     import django
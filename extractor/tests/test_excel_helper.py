@@ -0,0 +1,88 @@
+"""
+Unit tests for write_frames_to_xlsx and write_rows_to_sheet
+
+These tests check DataFrames with missing and infinite values can be
+written, as DataFrame.to_excel could write them, and that rows are written
+from lists and one-shot iterables alike.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from openpyxl import Workbook, load_workbook
+
+from extractor.utils.excel_helper import write_frames_to_xlsx, write_rows_to_sheet
+
+class WriteFramesToXlsxTest(SimpleTestCase):
+    """Test cases for write_frames_to_xlsx"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, 'data.xlsx')
+
+    def read_rows(self, sheet_name):
+        wb = load_workbook(self.path, read_only=True)
+        try:
+            return list(wb[sheet_name].iter_rows(values_only=True))
+        finally:
+            wb.close()
+
+    def test_sheets(self):
+        """Each frame is written to its sheet with a header row"""
+        write_frames_to_xlsx(self.path, {
+            'Summary': pd.DataFrame({'Information': ['Total PDFs'], 'Value': [3]}),
+            'Empty': pd.DataFrame(columns=['PDF File', 'Vendor']),
+        })
+        self.assertEqual(self.read_rows('Summary'), [('Information', 'Value'), ('Total PDFs', 3)])
+        self.assertEqual(self.read_rows('Empty'), [('PDF File', 'Vendor')])
+
+    def test_missing_values(self):
+        """NaN, None and NaT are written as blank cells"""
+        df = pd.DataFrame({
+            'PDF File': ['a.pdf', None, 'c.pdf'],
+            'Page Number': [1, np.nan, 3],
+            'Extracted At': pd.to_datetime(['2025-01-01', None, '2025-01-03']),
+        })
+        write_frames_to_xlsx(self.path, {'Sheet1': df})
+
+        rows = self.read_rows('Sheet1')
+        self.assertEqual(rows[1][:2], ('a.pdf', 1))
+        self.assertEqual(rows[2], (None, None, None))
+        self.assertEqual(rows[3][:2], ('c.pdf', 3))
+
+    def test_infinite_values(self):
+        """Infinities are written as formulas evaluating to #DIV/0!"""
+        write_frames_to_xlsx(self.path, {'Sheet1': pd.DataFrame({'Value': [1.5, np.inf, -np.inf]})})
+
+        rows = self.read_rows('Sheet1')
+        self.assertEqual(rows[1:], [(1.5,), ('=1/0',), ('=-1/0',)])
+
+    def test_formula_like_strings(self):
+        """Strings that look like formulas or links are kept as text"""
+        write_frames_to_xlsx(self.path, {'Sheet1': pd.DataFrame({'Value': ['=SUM(A1:A2)', 'http://example.com']})})
+
+        rows = self.read_rows('Sheet1')
+        self.assertEqual(rows[1:], [('=SUM(A1:A2)',), ('http://example.com',)])
+
+
+class WriteRowsToSheetTest(SimpleTestCase):
+    """Test cases for write_rows_to_sheet"""
+
+    def test_rows(self):
+        """Rows given as a list or as a generator are all written"""
+        rows = [('PLATE_NO', 'P1'), ('HEAT_NO', 'H1')]
+        for name, sheet_rows in (('list', rows), ('generator', (row for row in rows))):
+            with self.subTest(rows=name):
+                workbook = Workbook(write_only=True)
+                sheet = write_rows_to_sheet(workbook, 'Key Fields', ('Field', 'Value'), sheet_rows)
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    path = os.path.join(temp_dir, 'rows.xlsx')
+                    workbook.save(path)
+                    wb = load_workbook(path, read_only=True)
+                    written = list(wb['Key Fields'].iter_rows(values_only=True))
+                    wb.close()
+                self.assertEqual(written, [('Field', 'Value'), ('PLATE_NO', 'P1'), ('HEAT_NO', 'H1')])
+                self.assertEqual(sheet.column_dimensions['A'].width, 10)
@@ -0,0 +1,148 @@
+"""
+Unit tests for the file helpers in file_utils
+
+These tests check fast_copy_file() falls back to plain reads and writes
+when copy_file_range() is refused, and that prefix lookups in a
+build_prefix_index() listing find what a walk per prefix would.
+"""
+import os
+import errno
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from extractor.utils.file_utils import COPY_CHUNK_SIZE, build_prefix_index, fast_copy_file, find_by_prefix
+
+class FastCopyFileTest(SimpleTestCase):
+    """Test cases for fast_copy_file"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.src_path = os.path.join(temp_dir.name, 'src.pdf')
+        self.dst_path = os.path.join(temp_dir.name, 'dst.pdf')
+        # Several chunks and a partial one, so the fallback loops
+        self.content = os.urandom(COPY_CHUNK_SIZE * 2 + 1234)
+        with open(self.src_path, 'wb') as f:
+            f.write(self.content)
+        os.utime(self.src_path, ns=(1_600_000_000_123_456_789, 1_500_000_000_987_654_321))
+
+    def read_dst(self):
+        with open(self.dst_path, 'rb') as f:
+            return f.read()
+
+    def test_copy(self):
+        """The copy has the source's bytes"""
+        fast_copy_file(self.src_path, self.dst_path)
+        self.assertEqual(self.read_dst(), self.content)
+
+    def test_fallback_when_unsupported(self):
+        """Unsupported copy_file_range() errors fall back to a chunked copy"""
+        for error in (errno.ENOSYS, errno.EXDEV):
+            with self.subTest(errno=errno.errorcode[error]):
+                with patch('os.copy_file_range', create=True, side_effect=OSError(error, os.strerror(error))):
+                    fast_copy_file(self.src_path, self.dst_path)
+                self.assertEqual(self.read_dst(), self.content)
+
+    def test_fallback_after_partial_copy(self):
+        """Bytes copied before copy_file_range() failed are not kept twice"""
+        def partial_copy(src_fd, dst_fd, count, *args):
+            os.write(dst_fd, os.read(src_fd, 1000))
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+        with patch('os.copy_file_range', create=True, side_effect=partial_copy):
+            fast_copy_file(self.src_path, self.dst_path)
+        self.assertEqual(self.read_dst(), self.content)
+
+    def test_other_errors_are_raised(self):
+        """Errors from the copy itself are not hidden by the fallback"""
+        with patch('os.copy_file_range', create=True, side_effect=OSError(errno.EIO, os.strerror(errno.EIO))):
+            with self.assertRaises(OSError):
+                fast_copy_file(self.src_path, self.dst_path)
+
+    def test_keep_times(self):
+        """keep_times copies the access and modification times on the fallback path"""
+        with patch('os.copy_file_range', create=True, side_effect=OSError(errno.ENOSYS, os.strerror(errno.ENOSYS))):
+            fast_copy_file(self.src_path, self.dst_path, keep_times=True)
+        # Stat before reading, which may update the access times
+        src_stat = os.stat(self.src_path)
+        dst_stat = os.stat(self.dst_path)
+        self.assertEqual(dst_stat.st_mtime_ns, 1_500_000_000_987_654_321)
+        self.assertEqual(dst_stat.st_atime_ns, src_stat.st_atime_ns)
+        self.assertEqual(self.read_dst(), self.content)
+
+    def test_times_not_kept_by_default(self):
+        """Without keep_times the copy gets the current time"""
+        fast_copy_file(self.src_path, self.dst_path)
+        self.assertNotEqual(os.stat(self.dst_path).st_mtime_ns, os.stat(self.src_path).st_mtime_ns)
+
+
+class PrefixIndexTest(SimpleTestCase):
+    """Test cases for build_prefix_index and find_by_prefix"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = temp_dir.name
+        for relative_path in (
+            'a/cert.pdf',
+            'a/cert_page_1.pdf',
+            'b/cert_page_2.pdf',
+            'b/cert2.pdf',
+            'b/cert_notes.txt',
+            'c/zeta.pdf',
+        ):
+            path = os.path.join(self.directory, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+        self.prefix_index = build_prefix_index(self.directory)
+
+    def walk_by_prefix(self, prefix):
+        """Find the PDFs starting with prefix with a walk of their own"""
+        return [
+            (file, os.path.join(root, file))
+            for root, _, files in os.walk(self.directory)
+            for file in files
+            if file.startswith(prefix) and file.endswith('.pdf')
+        ]
+
+    def test_index_is_sorted(self):
+        """The index lists the PDFs only, sorted by filename"""
+        self.assertEqual(
+            [file for file, _, _ in self.prefix_index],
+            ['cert.pdf', 'cert2.pdf', 'cert_page_1.pdf', 'cert_page_2.pdf', 'zeta.pdf'],
+        )
+
+    def test_exact_prefix(self):
+        """A filename equal to the prefix plus suffix matches"""
+        self.assertEqual(
+            find_by_prefix(self.prefix_index, 'cert.pdf'),
+            [('cert.pdf', os.path.join(self.directory, 'a', 'cert.pdf'))],
+        )
+
+    def test_shared_prefix(self):
+        """Every file sharing the prefix matches, in walk order"""
+        for prefix in ('cert', 'cert_', 'cert_page', 'c', ''):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(find_by_prefix(self.prefix_index, prefix), self.walk_by_prefix(prefix))
+        self.assertEqual(len(find_by_prefix(self.prefix_index, 'cert')), 4)
+
+    def test_no_match(self):
+        """Prefixes matching no file find nothing"""
+        for prefix in ('aaa', 'cert_page_3', 'certificate', 'zz'):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(find_by_prefix(self.prefix_index, prefix), [])
+        self.assertEqual(find_by_prefix([], 'cert'), [])
+
+    def test_last_element(self):
+        """A match at the end of the index is found"""
+        self.assertEqual(
+            find_by_prefix(self.prefix_index, 'zeta'),
+            [('zeta.pdf', os.path.join(self.directory, 'c', 'zeta.pdf'))],
+        )
+        self.assertEqual(find_by_prefix(self.prefix_index, 'zeta.pdf!'), [])
+
+    def test_missing_directory(self):
+        """A directory that doesn't exist gives an empty index"""
+        self.assertEqual(build_prefix_index(os.path.join(self.directory, 'missing')), [])
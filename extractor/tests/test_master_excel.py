@@ -0,0 +1,209 @@
+"""
+Unit tests for the master Excel regeneration
+
+These tests check the page numbers each entry point resolves (database,
+master_log.xlsx and the extraction page sidecar) and the layout of the
+sheet build_and_write() writes.
+"""
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+
+from extractor.models import UploadedPDF, ExtractedData, Vendor
+from extractor.utils import update_excel, update_excel_new, update_excel_with_pages
+from extractor.utils.master_excel import HEADERS
+from extractor.utils.redis_client import get_redis_client
+
+# Nothing listens here, so the page map falls back to the sidecar file
+@override_settings(REDIS_URL='redis://127.0.0.1:1/0')
+class MasterExcelTest(TestCase):
+    """Test cases for the master Excel entry points"""
+
+    def setUp(self):
+        """Set up two PDFs and point the master files at a temporary directory"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+        self.master_log = self.temp_dir / 'logs' / 'master_log.xlsx'
+        self.master_backup = self.temp_dir / 'backups' / 'master.xlsx'
+        self.pages_log = self.temp_dir / 'logs' / 'extraction_pages.jsonl'
+
+        for target, value in (
+            ('extractor.utils.update_excel.MASTER_LOG', self.master_log),
+            ('extractor.utils.update_excel.MASTER_BACKUP', self.master_backup),
+            ('extractor.utils.update_excel_new.MASTER_LOG', self.master_log),
+            ('extractor.utils.update_excel_new.MASTER_BACKUP', self.master_backup),
+            ('extractor.utils.update_excel_with_pages.MASTER_BACKUP', self.master_backup),
+            ('extractor.utils.update_excel_with_pages.LOGS_DIR', self.pages_log.parent),
+            ('extractor.utils.update_excel_with_pages.PAGES_LOG', self.pages_log),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        get_redis_client.cache_clear()
+        self.addCleanup(get_redis_client.cache_clear)
+
+        self.vendor = Vendor.objects.create(name="Test Vendor")
+        self.pdf = UploadedPDF.objects.create(
+            vendor=self.vendor, file='uploads/cert_a.pdf', file_hash='abc123', file_size=10,
+        )
+        self.empty_pdf = UploadedPDF.objects.create(
+            vendor=self.vendor, file='uploads/cert_b.pdf', file_hash='def456', file_size=10,
+        )
+        for pdf, field_key, field_value, page_number in (
+            (self.pdf, 'PLATE_NO', 'P1', 2),
+            (self.pdf, 'HEAT_NO', 'H1', 2),
+            (self.pdf, 'TEST_CERT_NO', 'C/1', 2),
+            (self.pdf, 'PLATE_NO', 'P2', 3),
+            (self.pdf, 'HEAT_NO', 'H2', 3),
+            (self.empty_pdf, 'OTHER', 'x', 4),
+        ):
+            ExtractedData.objects.create(
+                vendor=self.vendor, pdf=pdf, field_key=field_key,
+                field_value=field_value, page_number=page_number,
+            )
+
+    def read_sheet(self, path):
+        """Return the sheet names and today's rows of the workbook at path"""
+        wb = load_workbook(path, read_only=True)
+        try:
+            sheet_names = wb.sheetnames
+            rows = list(wb[timezone.localdate().isoformat()].iter_rows(values_only=True))
+        finally:
+            wb.close()
+        return sheet_names, rows
+
+    def pages(self, rows):
+        """Map (PLATE_NO, HEAT_NO, TEST_CERT_NO) of each row to its page"""
+        page_idx = HEADERS.index('Page')
+        return {
+            tuple(value or '' for value in row[2:5]): row[page_idx]
+            for row in rows[1:]
+        }
+
+    def test_sheet_layout(self):
+        """The sheet has the master columns in order and one row per entry"""
+        self.assertTrue(update_excel.update_master_excel())
+
+        sheet_names, rows = self.read_sheet(self.master_backup)
+        self.assertEqual(sheet_names, [timezone.localdate().isoformat()])
+        self.assertEqual(rows[0], HEADERS)
+
+        created_a = self.pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')
+        created_b = self.empty_pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')
+        self.assertEqual(rows[1:], [
+            (1, 'Test Vendor', 'P1', 'H1', 'C/1', 'P1_H1_C-1.pdf', 2, 'uploads/cert_a.pdf', created_a, 'abc123', None),
+            (2, 'Test Vendor', 'P2', 'H2', None, 'P2_H2_.pdf', 3, 'uploads/cert_a.pdf', created_a, 'abc123', None),
+            (3, 'Test Vendor', None, None, None, 'page_1.pdf', 1, 'uploads/cert_b.pdf', created_b, 'def456', None),
+        ])
+
+        # The same workbook is kept in logs/, and both have a Parquet copy
+        self.assertEqual(self.master_log.read_bytes(), self.master_backup.read_bytes())
+        df = pd.read_parquet(self.master_backup.with_suffix('.parquet'))
+        self.assertEqual(list(df.columns), list(HEADERS))
+        self.assertEqual(df['PLATE_NO'].tolist(), ['P1', 'P2', ''])
+        self.assertTrue(self.master_log.with_suffix('.parquet').exists())
+
+    def test_source_pdf_filenames(self):
+        """Without combination filenames rows are named after their PDF"""
+        self.assertTrue(update_excel_new.update_master_excel())
+
+        _, rows = self.read_sheet(self.master_backup)
+        filename_idx = HEADERS.index('Filename')
+        self.assertEqual([row[filename_idx] for row in rows[1:]], ['cert_a.pdf', 'cert_a.pdf', 'cert_b.pdf'])
+        self.assertFalse(self.master_log.exists())
+
+    def test_previous_sheets_are_kept(self):
+        """Sheets from other days follow today's sheet, which is replaced"""
+        self.master_backup.parent.mkdir(parents=True)
+        wb = Workbook()
+        wb.active.title = '2020-01-01'
+        wb.active.append(['old'])
+        wb.create_sheet(timezone.localdate().isoformat()).append(['stale'])
+        wb.save(self.master_backup)
+
+        self.assertTrue(update_excel_new.update_master_excel())
+
+        sheet_names, rows = self.read_sheet(self.master_backup)
+        self.assertEqual(sheet_names, [timezone.localdate().isoformat(), '2020-01-01'])
+        self.assertEqual(rows[0], HEADERS)
+
+    def test_database_pages(self):
+        """update_excel takes page numbers from the database"""
+        self.assertTrue(update_excel.update_master_excel())
+
+        _, rows = self.read_sheet(self.master_backup)
+        self.assertEqual(self.pages(rows), {
+            ('P1', 'H1', 'C/1'): 2,
+            ('P2', 'H2', ''): 3,
+            ('', '', ''): 1,
+        })
+
+    def test_master_log_pages(self):
+        """update_excel_new prefers master_log.xlsx pages over the database"""
+        self.master_log.parent.mkdir(parents=True)
+        wb = Workbook()
+        wb.active.append(list(HEADERS))
+        wb.active.append([1, 'Test Vendor', None, 'H1', None, 'x.pdf', 9])
+        wb.save(self.master_log)
+
+        self.assertTrue(update_excel_new.update_master_excel())
+
+        _, rows = self.read_sheet(self.master_backup)
+        self.assertEqual(self.pages(rows), {
+            ('P1', 'H1', 'C/1'): 9,
+            ('P2', 'H2', ''): 3,
+            ('', '', ''): 1,
+        })
+
+    def test_master_log_parquet_pages(self):
+        """A Parquet copy of master_log.xlsx at least as new is read instead"""
+        self.master_log.parent.mkdir(parents=True)
+        wb = Workbook()
+        wb.active.append(list(HEADERS))
+        wb.active.append([1, 'Test Vendor', 'P2', None, None, 'x.pdf', 5])
+        wb.save(self.master_log)
+        pd.DataFrame(
+            [[1, 'Test Vendor', 'P2', '', '', 'x.pdf', 7, '', '', '', '']], columns=HEADERS,
+        ).to_parquet(self.master_log.with_suffix('.parquet'), index=False)
+        stat = os.stat(self.master_log)
+        os.utime(self.master_log.with_suffix('.parquet'), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertTrue(update_excel_new.update_master_excel())
+
+        _, rows = self.read_sheet(self.master_backup)
+        self.assertEqual(self.pages(rows)[('P2', 'H2', '')], 7)
+
+    def test_sidecar_pages(self):
+        """update_excel_with_pages takes pages from the sidecar, or page 1"""
+        self.pages_log.parent.mkdir(parents=True)
+        with open(self.pages_log, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'PLATE_NO': 'P1', 'HEAT_NO': 'H1', 'TEST_CERT_NO': 'C/1', 'Page': 5}) + '\n')
+            f.write('not json\n')
+            f.write(json.dumps({'PLATE_NO': 'P2', 'HEAT_NO': 'H2', 'TEST_CERT_NO': 'other', 'Page': 6}) + '\n')
+
+        self.assertTrue(update_excel_with_pages.update_master_excel_with_pages())
+
+        _, rows = self.read_sheet(self.master_backup)
+        # Entries match on all three fields; the database pages are not used
+        self.assertEqual(self.pages(rows), {
+            ('P1', 'H1', 'C/1'): 5,
+            ('P2', 'H2', ''): 1,
+            ('', '', ''): 1,
+        })
+
+    def test_recorded_pages(self):
+        """Pages recorded at extraction time are read back from the sidecar"""
+        update_excel_with_pages.record_extraction_pages([
+            {'PLATE_NO': 'P2', 'HEAT_NO': 'H2', 'Page': 8},
+        ])
+
+        self.assertEqual(update_excel_with_pages.load_extraction_pages(), {('P2', 'H2', ''): 8})
@@ -0,0 +1,48 @@
+"""
+Unit tests for the session store falling back to the database
+
+Sessions are cached in Redis; these tests point the session cache at a port
+nothing listens on and check sessions still work from the database.
+"""
+from django.test import TestCase, override_settings
+
+from extractor.session_store import SessionStore
+
+UNREACHABLE_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:1/0',
+        'OPTIONS': {
+            'socket_connect_timeout': 0.1,
+            'socket_timeout': 0.1,
+        },
+    },
+}
+
+@override_settings(CACHES=UNREACHABLE_CACHES, SESSION_CACHE_ALIAS='sessions')
+class SessionStoreFallbackTest(TestCase):
+    """Test sessions while the session cache is unreachable"""
+
+    def test_save_and_load(self):
+        """A saved session can be loaded again from the database"""
+        session = SessionStore()
+        session['vendor_id'] = 3
+        session.save()
+
+        loaded = SessionStore(session.session_key)
+        self.assertEqual(loaded['vendor_id'], 3)
+        self.assertTrue(loaded.exists(session.session_key))
+
+    def test_delete(self):
+        """A deleted session is gone from the database"""
+        session = SessionStore()
+        session['vendor_id'] = 3
+        session.save()
+        session_key = session.session_key
+
+        session.delete()
+        self.assertFalse(SessionStore().exists(session_key))
+        self.assertEqual(SessionStore(session_key).load(), {})
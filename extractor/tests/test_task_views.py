@@ -0,0 +1,71 @@
+"""
+Unit tests for the task status and progress endpoints
+
+task-status/ and progress/ are served by the same view. These tests check
+the payload both URLs return for the states a polled task goes through;
+the result backend is patched to return the task meta.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+TASK_METAS = {
+    'PENDING': {'status': 'PENDING', 'result': None},
+    'PROGRESS': {'status': 'PROGRESS', 'result': {'phase': 'extracting', 'current': 2, 'total': 4}},
+    'SUCCESS': {'status': 'SUCCESS', 'result': {'status': 'completed', 'extracted': 5}},
+    'FAILURE': {'status': 'FAILURE', 'result': {'exc_type': 'ValueError'}},
+}
+
+EXPECTED_PAYLOADS = {
+    'PENDING': {
+        'state': 'PENDING',
+        'progress': 0,
+        'message': 'Task is queued...',
+    },
+    # The dashboard's poller reads current, total and phase
+    'PROGRESS': {
+        'state': 'PROGRESS',
+        'progress': 40,
+        'message': 'Processing: Extracting...',
+        'phase': 'extracting',
+        'current': 2,
+        'total': 4,
+    },
+    # The result, as task_status returned it before
+    'SUCCESS': {
+        'state': 'SUCCESS',
+        'progress': 100,
+        'message': '✅ Extraction completed! 5 fields extracted.',
+        'result': {'status': 'completed', 'extracted': 5},
+    },
+    'FAILURE': {
+        'state': 'FAILURE',
+        'progress': 100,
+        'message': '❌ Extraction failed due to an error.',
+    },
+}
+
+class TaskViewsTest(TestCase):
+    """Test cases for the task_status and task_progress URLs"""
+
+    def get_json(self, url_name, state):
+        """Request url_name for a task in state and return the decoded payload"""
+        with patch('extractor.views.core.AsyncResult') as mock_async_result:
+            mock_async_result.return_value.backend.get_task_meta.return_value = TASK_METAS[state]
+            response = self.client.get(reverse(url_name, args=['task-1']))
+        self.assertEqual(response.status_code, 200)
+        mock_async_result.assert_called_once_with('task-1')
+        return response.json()
+
+    def test_task_status(self):
+        """task_status returns the full progress payload"""
+        for state, expected in EXPECTED_PAYLOADS.items():
+            with self.subTest(state=state):
+                self.assertEqual(self.get_json('task_status', state), expected)
+
+    def test_task_progress(self):
+        """task_progress returns the same payload as task_status"""
+        for state, expected in EXPECTED_PAYLOADS.items():
+            with self.subTest(state=state):
+                self.assertEqual(self.get_json('task_progress', state), expected)
@@ -0,0 +1,144 @@
+"""
+Unit tests for vendor scoring
+
+The automaton and combined regex in vendor_detection must count matches
+exactly like running re.findall() once per pattern did, so these tests
+score sample texts both ways and compare.
+"""
+import re
+
+from django.test import SimpleTestCase
+
+from extractor.utils.vendor_detection import (
+    VENDOR_PATTERNS,
+    GROUP_PATTERNS,
+    RESIDUAL_PATTERN,
+    count_keyword_matches,
+    count_matches,
+    score_vendors,
+    detect_vendor_from_text,
+)
+
+SAMPLE_TEXTS = [
+    'POSCO International Corp.\nMill Test Certificate',
+    # Nested matches: 'posco' inside 'posco international', 'jfe' inside 'jfe steel'
+    'posco international posco posco international',
+    'JFE Steel Corporation, JFE Holdings, jfe',
+    # Whitespace runs, line breaks and tabs inside multi-word patterns
+    'TATA   STEEL\nLimited, tata\t\tgroup, Jamshedpur',
+    'citic\n\nsteel\r\ncitic  group',
+    '  nippon \n steel  ',
+    # Negative patterns, including ones nested in a positive pattern
+    'This is not posco material, ex-posco stock from POSCO',
+    'not tata steel, not tata, ex-tata',
+    'ex-jfe plate from JFE Steel, not  jfe',
+    'not baosteel but bao steel',
+    'not citic',
+    # Patterns needing the regex engine
+    'Pohang Iron & Steel Co., pohang iron  steel, pohang iron &steel',
+    'Japan Iron &   Steel, japan\niron\nsteel',
+    # CJK patterns
+    '포스코 POSCO 포스코',
+    '中信钢铁 中信集团 宝钢 宝山钢铁 新日本製鐵 新日鐵 川崎製鉄',
+    # Several vendors capping at 1.0, the first one must win
+    'tata steel tata steel posco international posco international',
+    'baosteel baosteel tata steel tata steel',
+    # Long text, scaled down by the length factor
+    'posco international ' + 'filler text ' * 200,
+    'posco ' * 50,
+    '',
+    'no vendor here',
+]
+
+
+def reference_counts(text_lower):
+    """Count every pattern's matches with one re.findall() each"""
+    return {
+        name: len(re.findall(pattern.pattern, text_lower))
+        for name, pattern in GROUP_PATTERNS.items()
+    }
+
+
+def reference_scores(text_lower):
+    """Score every vendor with one re.findall() per pattern"""
+    vendor_scores = {}
+    text_length = len(text_lower)
+    text_length_factor = min(1.0, 1000 / text_length) if text_length > 1000 else 1.0
+
+    for vendor_id, config in VENDOR_PATTERNS.items():
+        score = 0.0
+        match_count = 0
+        for pattern, weight in config['patterns']:
+            matches = len(re.findall(pattern, text_lower))
+            score += weight * matches
+            match_count += matches
+        if match_count == 0:
+            continue
+        for neg_pattern in config.get('negative_patterns', []):
+            if re.findall(neg_pattern, text_lower):
+                score -= 0.5
+        if match_count > 1:
+            score *= 1.2
+        vendor_scores[vendor_id] = min(score * text_length_factor, 1.0)
+    return vendor_scores
+
+
+def new_counts(text_lower):
+    counts = count_keyword_matches(' '.join(text_lower.split()))
+    if RESIDUAL_PATTERN is not None:
+        for name, count in count_matches(RESIDUAL_PATTERN, text_lower).items():
+            counts[name] += count
+    return {name: counts.get(name, 0) for name in GROUP_PATTERNS}
+
+
+class VendorScoringTest(SimpleTestCase):
+    """Test cases comparing vendor scoring against per-pattern findall()"""
+
+    def test_match_counts(self):
+        """Every pattern is counted like findall() counts it"""
+        for text in SAMPLE_TEXTS:
+            with self.subTest(text=text[:60]):
+                text_lower = text.lower()
+                self.assertEqual(new_counts(text_lower), reference_counts(text_lower))
+
+    def test_scores(self):
+        """Vendor scores equal the findall() scores"""
+        for text in SAMPLE_TEXTS:
+            with self.subTest(text=text[:60]):
+                text_lower = text.lower()
+                expected = reference_scores(text_lower)
+                scores = score_vendors(text_lower)
+                # Scoring stops at the first vendor reaching the cap
+                for vendor_id, score in scores.items():
+                    self.assertAlmostEqual(score, expected[vendor_id])
+                if expected:
+                    self.assertEqual(
+                        max(scores.items(), key=lambda x: x[1]),
+                        max(expected.items(), key=lambda x: x[1]),
+                    )
+                else:
+                    self.assertEqual(scores, {})
+
+    def test_negative_patterns(self):
+        """A negative pattern lowers the score once, however often it matches"""
+        once = score_vendors('tata group, not tata')
+        twice = score_vendors('tata group, not tata, not tata')
+        self.assertAlmostEqual(once['tata_steel'], 0.6 - 0.5)
+        self.assertAlmostEqual(twice['tata_steel'], 0.6 - 0.5)
+        # 'citic group' still matches inside the negative 'not citic group'
+        self.assertAlmostEqual(score_vendors('not citic group')['citic_steel'], 0.7 - 0.5)
+
+    def test_negative_pattern_without_positive_match(self):
+        """Vendors whose only match is negative get no score"""
+        self.assertEqual(score_vendors('not tata, ex-tata'), {})
+        self.assertEqual(score_vendors('not citic'), {})
+
+    def test_score_is_capped(self):
+        """Scores never exceed 1.0"""
+        scores = score_vendors('posco international ' * 10)
+        self.assertEqual(scores['posco'], 1.0)
+
+    def test_capped_vendor_is_detected(self):
+        """Of vendors at the cap, the first in VENDOR_PATTERNS is detected"""
+        vendor_id, confidence = detect_vendor_from_text('baosteel baosteel tata steel tata steel')
+        self.assertEqual((vendor_id, confidence), ('tata_steel', 1.0))
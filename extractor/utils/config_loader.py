@@ -1,6 +1,7 @@
 import json
 import os
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger('extractor')
 
@@ -27,6 +28,10 @@ def find_vendor_config(vendor, settings):
     """
     Find vendor configuration by trying multiple locations.
     
+    Loaded configs are cached by path and modification time, so a config
+    is only read from disk again after the file changes. The returned
+    config is shared between callers and must not be modified.
+    
     Args:
         vendor: The Vendor model instance
         settings: Django settings module
@@ -35,14 +40,18 @@ def find_vendor_config(vendor, settings):
         A tuple (config_dict, config_path) with the loaded config and the path it was found at,
         or (None, None) if no config was found
     """
+    media_root = str(settings.MEDIA_ROOT)
+    base_dir = str(settings.BASE_DIR)
+    config_file_name = vendor.config_file.name
+    
     # 1. First try the media path (for uploaded configs)
-    media_config_path = os.path.join(settings.MEDIA_ROOT, vendor.config_file.name)
+    media_config_path = os.path.join(media_root, config_file_name)
     
-    # 2. Also try the direct path from vendor.config_file
+    # The direct path from vendor.config_file depends on its storage
     direct_config_path = vendor.config_file.path if hasattr(vendor.config_file, 'path') else None
     
-    # 3. Try a path with just the base filename (without random suffix)
-    base_name = os.path.basename(vendor.config_file.name)
+    # 2. Try a path with just the base filename (without random suffix)
+    base_name = os.path.basename(config_file_name)
     if '_' in base_name:
         # Remove random suffix (e.g., citic_steel_0VwOwk2.json -> citic_steel.json)
         parts = base_name.split('_')
@@ -52,13 +61,13 @@ def find_vendor_config(vendor, settings):
             ext_idx = last_part.rfind('.')
             if ext_idx > 0:
                 clean_name = '_'.join(parts[:-1]) + last_part[ext_idx:]
-                template_config_path = os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', clean_name)
+                template_config_path = os.path.join(base_dir, 'extractor', 'vendor_configs', clean_name)
             else:
-                template_config_path = os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', base_name)
+                template_config_path = os.path.join(base_dir, 'extractor', 'vendor_configs', base_name)
         else:
-            template_config_path = os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', base_name)
+            template_config_path = os.path.join(base_dir, 'extractor', 'vendor_configs', base_name)
     else:
-        template_config_path = os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', base_name)
+        template_config_path = os.path.join(base_dir, 'extractor', 'vendor_configs', base_name)
     
     # Try each path in order
     config_paths = [
@@ -66,19 +75,25 @@ def find_vendor_config(vendor, settings):
         direct_config_path,
         template_config_path,
         # Final fallback - try base template
-        os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', base_name)
+        os.path.join(base_dir, 'extractor', 'vendor_configs', base_name)
     ]
     
     for path in config_paths:
-        if path and os.path.exists(path):
-            try:
-                config = load_vendor_config(path)
-                logger.info(f"Successfully loaded vendor config from {path}")
-                return config, path
-            except Exception as e:
-                logger.warning(f"Failed to load config from {path}: {str(e)}")
+        if not path:
+            continue
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        try:
+            config = load_vendor_config_cached(path, mtime_ns)
+            logger.info(f"Successfully loaded vendor config from {path}")
+            return config, path
+        except Exception as e:
+            logger.warning(f"Failed to load config from {path}: {str(e)}")
     
-    # If no config found, create a simple one
+    # If no config found, create a simple one. It is not cached, so a config
+    # added later is picked up on the next lookup.
     logger.warning(f"No config found for vendor {vendor.name}, creating placeholder")
     # Create minimal config
     placeholder_config = {
@@ -89,7 +104,7 @@ def find_vendor_config(vendor, settings):
     
     # Save this config for future use
     try:
-        placeholder_path = os.path.join(settings.BASE_DIR, 'extractor', 'vendor_configs', base_name)
+        placeholder_path = os.path.join(base_dir, 'extractor', 'vendor_configs', base_name)
         with open(placeholder_path, 'w') as f:
             json.dump(placeholder_config, f, indent=2)
         logger.info(f"Created placeholder config at {placeholder_path}")
@@ -97,3 +112,13 @@ def find_vendor_config(vendor, settings):
     except Exception as e:
         logger.error(f"Failed to save placeholder config: {str(e)}")
         return placeholder_config, None
+
+@lru_cache(maxsize=64)
+def load_vendor_config_cached(vendor_path, mtime_ns):
+    """
+    load_vendor_config() cached by path and modification time, so a file
+    is read again once it has been edited. Failed loads are not cached.
+    """
+    return load_vendor_config(vendor_path)
+
+find_vendor_config.cache_clear = load_vendor_config_cached.cache_clear
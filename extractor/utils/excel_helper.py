@@ -11,6 +11,8 @@ from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from django.conf import settings
 from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+import xlsxwriter
 
 # Define consistent styles
 HEADER_FONT = Font(name='Arial', size=12, bold=True, color='FFFFFF')
@@ -147,3 +149,80 @@ def write_dataframe_to_sheet(workbook, sheet_name, df):
             cell.border = BORDER
     
     return sheet
+
+def write_rows_to_sheet(workbook, sheet_name, headers, rows):
+    """
+    Write rows to a new sheet of a write-only workbook with the same
+    formatting apply_formatting() gives a regular workbook.
+
+    Column widths have to be set before the first row is written, so rows
+    is read twice. A list or tuple is used as-is; any other iterable is
+    read into a list first.
+    """
+    if not isinstance(rows, (list, tuple)):
+        rows = list(rows)
+    sheet = workbook.create_sheet(sheet_name)
+    
+    # Auto-adjust column widths based on content
+    for col_idx, header in enumerate(headers):
+        max_length = len(str(header)) if header else 0
+        for row in rows:
+            value = row[col_idx]
+            if value:
+                cell_length = len(str(value))
+                if cell_length > max_length:
+                    max_length = cell_length
+        sheet.column_dimensions[get_column_letter(col_idx + 1)].width = min(max_length + 2, 40)  # Cap at 40 for readability
+    
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = BORDER
+        header_cells.append(cell)
+    sheet.append(header_cells)
+    
+    for row in rows:
+        cells = []
+        for value in row:
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.border = BORDER
+            cells.append(cell)
+        sheet.append(cells)
+    
+    return sheet
+
+def write_frames_to_xlsx(path, frames):
+    """
+    Write each DataFrame in frames (sheet name -> DataFrame) to its own
+    sheet of a new workbook at path, without the index.
+
+    The workbook is written with xlsxwriter in constant_memory mode, so each
+    row is flushed to disk as soon as it is written. That mode only keeps
+    the current row, so rows are written in order here rather than through
+    DataFrame.to_excel, which writes column by column. Strings are always
+    stored as text, never turned into formulas or links.
+
+    Missing values (NaN, None, NaT) are left blank like DataFrame.to_excel
+    leaves them; infinities are written as Excel errors, which xlsxwriter
+    would otherwise refuse.
+    """
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'nan_inf_to_errors': True,
+    })
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for sheet_name, df in frames.items():
+            sheet = workbook.add_worksheet(sheet_name)
+            sheet.write_row(0, 0, [str(column) for column in df.columns], header_format)
+            if df.isna().to_numpy().any():
+                df = df.astype(object).where(df.notna(), None)
+            for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+                sheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
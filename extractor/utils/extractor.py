@@ -38,6 +38,34 @@ def extract_text_from_page(page: Any) -> str:
         logger.error(f"Text extraction failed: {e}")
     return ""
 
+def detect_multilingual_content(text: str) -> Tuple[bool, bool]:
+    """
+    Detect multilingual content (Chinese, Japanese, Korean mixed with English)
+    and fragmented text. Returns (is_multilingual, has_fragmentation).
+    """
+    if not text:
+        return False, False
+
+    # Check for CJK characters (Chinese, Japanese, Korean)
+    cjk_pattern = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\u3040-\u309f\u30a0-\u30ff\uac00-\ud7af]')
+    has_cjk = bool(cjk_pattern.search(text))
+
+    # Check for English letters
+    english_pattern = re.compile(r'[a-zA-Z]')
+    has_english = bool(english_pattern.search(text))
+
+    # Check for common fragmentation indicators (excessive whitespace, newlines)
+    fragmentation_indicators = [
+        r'\n\s*\n\s*\n',  # Multiple consecutive newlines
+        r'[A-Za-z]\s+[A-Za-z]\s+[A-Za-z]',  # Spaced out words
+        r'\w\s+[:：]\s+',  # Spaced out colons
+        r'(Part|Heat|Report|Certificate|Test)\s*\n\s*No',  # Split "Part No" across lines
+    ]
+
+    has_fragmentation = any(re.search(pattern, text, re.IGNORECASE) for pattern in fragmentation_indicators)
+
+    return has_cjk and has_english, has_fragmentation
+
 def extract_tables_from_page(page: Any, vendor_config: Dict[str, Any]) -> List[Dict[str, str]]:
     """Extract tabular data from a page."""
     entries = []
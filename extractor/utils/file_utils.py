@@ -1,4 +1,6 @@
 import os
+import errno
+import bisect
 import logging
 import shutil
 import tempfile
@@ -8,6 +10,13 @@ import io
 
 logger = logging.getLogger(__name__)
 
+# Chunk size of the read/write fallback in fast_copy_file()
+COPY_CHUNK_SIZE = 1 << 20
+
+# copy_file_range() errors meaning the kernel or filesystem can't do the copy,
+# rather than that the copy itself failed
+COPY_FILE_RANGE_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+
 def file_exists_and_readable(file_path):
     """
     Checks if a file exists and is readable.
@@ -79,6 +88,83 @@ def safe_copy_file(src_path, dst_path, chunk_size=1024*1024):
     except Exception as e:
         return False, f"Error copying file: {str(e)}"
 
+def fast_copy_file(src_path, dst_path, keep_times=False):
+    """
+    Copy the contents of src_path to dst_path.
+
+    Uses os.copy_file_range() where available, which copies inside the
+    kernel and lets filesystems that support it clone the data instead.
+    Otherwise, or if the filesystem refuses, copies in COPY_CHUNK_SIZE
+    chunks through a single reused buffer.
+
+    Args:
+        keep_times: Also copy the access and modification times, as
+            shutil.copy2() does. ZipFile.write() stores the modification
+            time, so copies that get archived keep the original date.
+    """
+    with open(src_path, 'rb') as src_file, open(dst_path, 'wb') as dst_file:
+        src_fd = src_file.fileno()
+        dst_fd = dst_file.fileno()
+        copied = False
+
+        if hasattr(os, 'copy_file_range'):
+            try:
+                # Returns 0 at end of file; the size is only a per-call limit
+                size = max(os.fstat(src_fd).st_size, COPY_CHUNK_SIZE)
+                while os.copy_file_range(src_fd, dst_fd, size):
+                    pass
+                copied = True
+            except OSError as e:
+                if e.errno not in COPY_FILE_RANGE_UNSUPPORTED:
+                    raise
+                # Start over, in case part of the file was copied
+                os.lseek(src_fd, 0, os.SEEK_SET)
+                os.lseek(dst_fd, 0, os.SEEK_SET)
+                os.ftruncate(dst_fd, 0)
+
+        if not copied:
+            buffer = bytearray(COPY_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = src_file.readinto(buffer)
+                if not read:
+                    break
+                dst_file.write(view[:read])
+
+    if keep_times:
+        stat = os.stat(src_path)
+        os.utime(dst_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+def build_prefix_index(directory, suffix='.pdf'):
+    """
+    List the files under directory whose names end with suffix in a single
+    os.walk() pass, so many name prefixes can be looked up with
+    find_by_prefix() without walking the tree again for each one.
+
+    Returns (filename, walk position, path) tuples sorted by filename;
+    empty if the directory doesn't exist.
+    """
+    prefix_index = []
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith(suffix):
+                prefix_index.append((file, len(prefix_index), os.path.join(root, file)))
+    prefix_index.sort()
+    return prefix_index
+
+def find_by_prefix(prefix_index, prefix):
+    """
+    Return (filename, path) of the files in prefix_index, from
+    build_prefix_index(), whose names start with prefix, in os.walk() order.
+    """
+    matches = []
+    for file, position, path in prefix_index[bisect.bisect_left(prefix_index, (prefix,)):]:
+        if not file.startswith(prefix):
+            break
+        matches.append((position, file, path))
+    matches.sort()
+    return [(file, path) for _, file, path in matches]
+
 def create_safe_temp_dir():
     """
     Creates a safe temporary directory with proper permissions.
@@ -0,0 +1,22 @@
+# json_response.py
+"""
+JsonResponse replacement encoding with orjson.
+
+The upload and task progress endpoints are polled by the frontend every
+second or so; orjson encodes straight to bytes several times faster than
+the stdlib encoder behind JsonResponse.
+"""
+import orjson
+from django.http import HttpResponse
+
+class OrjsonResponse(HttpResponse):
+    """
+    HttpResponse with a JSON body encoded by orjson.
+
+    Takes the same data as JsonResponse. Non-string dict keys are allowed,
+    as with json.dumps, and values orjson cannot encode natively are
+    passed through str().
+    """
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS), **kwargs)
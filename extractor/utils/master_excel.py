@@ -0,0 +1,276 @@
+# master_excel.py
+"""
+Shared implementation of the master Excel regeneration.
+
+update_excel, update_excel_new and update_excel_with_pages only differ in
+where they look up page numbers and which files they write, so they all
+delegate to build_and_write() with their own page resolver.
+"""
+import os
+import shutil
+import logging
+from collections import defaultdict
+from itertools import zip_longest
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+import pandas as pd
+import xlsxwriter
+from openpyxl import load_workbook
+from extractor.models import ExtractedData, UploadedPDF
+
+logger = logging.getLogger('extractor')
+
+FIELD_KEYS = ('PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO')
+
+# Position of each field's value list in the per-PDF buckets built by build_and_write()
+FIELD_IDX = {'PLATE_NO': 0, 'HEAT_NO': 1, 'TEST_CERT_NO': 2}
+
+HEADERS = (
+    'Sr No', 'Vendor', 'PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO', 'Filename',
+    'Page', 'Source PDF', 'Created', 'Hash', 'Remarks',
+)
+
+# Column types that are known up front, so pandas does not infer them
+HEADER_DTYPES = {'Sr No': 'int64', 'Page': 'int32'}
+
+# Locations of the master files, resolved once at import
+LOGS_DIR = Path(settings.BASE_DIR) / 'logs'
+BACKUPS_DIR = Path(settings.MEDIA_ROOT) / 'backups'
+MASTER_LOG = LOGS_DIR / 'master_log.xlsx'
+MASTER_BACKUP = BACKUPS_DIR / 'master.xlsx'
+
+def db_page_number(page_numbers, plate_no, heat_no, test_cert_no):
+    """
+    Page resolver backed by the page numbers stored in the database.
+
+    Looks the row up by PLATE_NO, then HEAT_NO, then TEST_CERT_NO and
+    returns None if none of them has a stored page number.
+    """
+    page_number = None
+    if plate_no:
+        page_number = page_numbers.get(('PLATE_NO', plate_no))
+    if page_number is None and heat_no:
+        page_number = page_numbers.get(('HEAT_NO', heat_no))
+    if page_number is None and test_cert_no:
+        page_number = page_numbers.get(('TEST_CERT_NO', test_cert_no))
+    return page_number
+
+def copy_previous_sheets(wb, path, skip_sheet):
+    """
+    Stream every sheet of the existing workbook at path, except skip_sheet,
+    into the xlsxwriter workbook wb so earlier days are kept.
+    """
+    if not os.path.exists(path):
+        return
+
+    try:
+        previous_wb = load_workbook(path, read_only=True)
+    except Exception as e:
+        logger.warning(f"Could not read previous sheets from {path}: {str(e)}")
+        return
+
+    try:
+        for previous_ws in previous_wb.worksheets:
+            if previous_ws.title == skip_sheet:
+                continue
+            ws = wb.add_worksheet(previous_ws.title)
+            for row_idx, row in enumerate(previous_ws.iter_rows(values_only=True)):
+                ws.write_row(row_idx, 0, row)
+    finally:
+        previous_wb.close()
+
+def parquet_path(path):
+    """Return the path of the Parquet copy kept next to the workbook at path."""
+    return Path(path).with_suffix('.parquet')
+
+def write_parquet(rows, path):
+    """
+    Write today's rows to a zstd-compressed Parquet file, which programmatic
+    consumers can load far faster than the workbook.
+    """
+    df = pd.DataFrame.from_records(rows, columns=HEADERS).astype(HEADER_DTYPES, copy=False)
+    df.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+
+def build_and_write(page_resolver, destinations, combination_filenames=False):
+    """
+    Build the master sheet from all extracted data and write it out.
+
+    Args:
+        page_resolver: Callable (page_numbers, plate_no, heat_no, test_cert_no)
+            returning the page for a row, or None to fall back to page 1.
+            page_numbers maps (field_key, field_value) to the page stored
+            in the database for the current PDF.
+        destinations: Paths to write; the workbook is saved to the first
+            one and copied to the others. Sheets for other dates already
+            in the first file are kept. Today's rows are also written to a
+            .parquet file next to each destination.
+        combination_filenames: Name rows after their field values
+            (PLATE_HEAT_CERT.pdf) instead of the source PDF's basename.
+
+    Returns:
+        True if the file was written, False if there was nothing to write
+        or an error occurred
+    """
+    try:
+        # Get all extracted data
+        if not ExtractedData.objects.exists():
+            logger.warning("No extracted data found in database")
+            return False
+
+        # Group entries by PDF: ([PLATE_NO...], [HEAT_NO...], [TEST_CERT_NO...],
+        # {(field_key, field_value): page_number})
+        pdf_entries = defaultdict(lambda: ([], [], [], {}))
+
+        # First, group all entries by PDF ID and collect all values.
+        # Rows are streamed as plain tuples, without building model instances.
+        extracted_entries = (
+            ExtractedData.objects
+            .order_by('created_at')
+            .values_list('pdf_id', 'field_key', 'field_value', 'page_number')
+            .iterator(chunk_size=5000)
+        )
+        for pdf_id, field_key, field_value, page_number in extracted_entries:
+            # Every PDF gets buckets, even if it has none of the fields
+            buckets = pdf_entries[pdf_id]
+
+            # Store all values by field type; other fields are ignored
+            field_idx = FIELD_IDX.get(field_key)
+            if field_idx is not None:
+                buckets[field_idx].append(field_value)
+                buckets[3][(field_key, field_value)] = page_number
+
+        # Get only the PDFs referenced by extracted data, with their vendors, in one query
+        pdfs_by_id = UploadedPDF.objects.select_related('vendor').in_bulk(list(pdf_entries))
+
+        # Every PDF that exists produces at least one row
+        if not pdfs_by_id:
+            logger.warning("No data rows created for Excel")
+            return False
+
+        # Ensure the output directories exist
+        for destination in destinations:
+            Path(destination).parent.mkdir(parents=True, exist_ok=True)
+
+        # Rows are streamed to disk as they are written (constant_memory),
+        # so the workbook never holds the sheet in memory as cells
+        sheet_name = timezone.localdate().isoformat()
+        wb = xlsxwriter.Workbook(str(destinations[0]), {'constant_memory': True})
+        ws = wb.add_worksheet(sheet_name)
+        ws.write_row(0, 0, HEADERS)
+
+        # Filename-safe versions of field values, computed once per distinct value
+        safe_values = {'': ''}
+
+        def safe_value(value):
+            safe = safe_values.get(value)
+            if safe is None:
+                safe = safe_values[value] = value.replace('/', '-')
+            return safe
+
+        # Rows written today, kept for the Parquet copy
+        rows = []
+
+        # Create rows for each PDF with all its entries
+        sr_no = 1
+        for pdf_id, (plate_nos, heat_nos, test_cert_nos, page_numbers) in pdf_entries.items():
+            pdf = pdfs_by_id.get(pdf_id)
+            if pdf is None:
+                logger.warning(f"PDF with ID {pdf_id} not found")
+                continue
+
+            # Values that are the same for every row of this PDF
+            vendor_name = pdf.vendor.name
+            source_pdf = pdf.file.name
+            pdf_filename = os.path.basename(source_pdf)
+            created_str = pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')
+            file_hash = pdf.file_hash or ''
+
+            # If there are no entries at all, create one empty row
+            if not (plate_nos or heat_nos or test_cert_nos):
+                row = (
+                    sr_no,
+                    vendor_name,
+                    '',
+                    '',
+                    '',
+                    "page_1.pdf" if combination_filenames else pdf_filename,
+                    1,
+                    source_pdf,
+                    created_str,
+                    file_hash,
+                    '',
+                )
+                ws.write_row(sr_no, 0, row)
+                rows.append(row)
+                sr_no += 1
+                continue
+
+            # One row per entry of the longest list; shorter lists are padded with ''
+            for plate_no, heat_no, test_cert_no in zip_longest(plate_nos, heat_nos, test_cert_nos, fillvalue=''):
+                page_number = page_resolver(page_numbers, plate_no, heat_no, test_cert_no)
+                if page_number is None:
+                    page_number = 1  # Default to 1
+
+                if combination_filenames:
+                    # Generate combination-based filename
+                    plate_safe = safe_value(plate_no)
+                    heat_safe = safe_value(heat_no)
+                    test_cert_safe = safe_value(test_cert_no)
+
+                    if plate_safe or heat_safe or test_cert_safe:
+                        filename = f"{plate_safe}_{heat_safe}_{test_cert_safe}.pdf"
+                    else:
+                        filename = f"page_{page_number}.pdf"
+                else:
+                    filename = pdf_filename
+
+                row = (
+                    sr_no,
+                    vendor_name,
+                    plate_no,
+                    heat_no,
+                    test_cert_no,
+                    filename,
+                    page_number,
+                    source_pdf,
+                    created_str,
+                    file_hash,
+                    '',
+                )
+                ws.write_row(sr_no, 0, row)
+                rows.append(row)
+                sr_no += 1
+
+        row_count = sr_no - 1
+
+        # Today's sheet comes first and replaces any earlier run from today;
+        # sheets from previous days are carried over after it
+        copy_previous_sheets(wb, destinations[0], sheet_name)
+
+        # Save once and copy the identical file to any other location
+        try:
+            wb.close()
+            logger.info(f"Saved Excel file to {destinations[0]}")
+
+            for destination in destinations[1:]:
+                shutil.copyfile(destinations[0], destination)
+                logger.info(f"Saved Excel file to {destination}")
+        except Exception as e:
+            logger.error(f"Error saving Excel files: {str(e)}", exc_info=True)
+            raise  # Re-raise the exception after logging
+
+        # The Parquet copy is a convenience; the workbook has already been saved
+        try:
+            write_parquet(rows, parquet_path(destinations[0]))
+            for destination in destinations[1:]:
+                shutil.copyfile(parquet_path(destinations[0]), parquet_path(destination))
+        except Exception as e:
+            logger.warning(f"Could not write Parquet copy of master Excel: {str(e)}")
+
+        logger.info(f"Successfully updated master Excel file with {row_count} entries")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error updating master Excel: {str(e)}", exc_info=True)
+        return False
@@ -3,6 +3,8 @@ import pytesseract
 import pdfplumber
 import re
 import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Union, Tuple
 from PIL import Image, ImageEnhance, ImageFilter, ImageOps
 import numpy as np
@@ -99,6 +101,113 @@ def preprocess_image_for_ocr(image):
         logger.warning(f"Image preprocessing failed, using original: {e}")
         return image.convert('L') if image.mode != 'L' else image
 
+def ocr_image(original_image, multilingual=True):
+    """
+    Run OCR on a rendered page image, trying several preprocessing methods
+    and OCR configurations and keeping the best scoring text.
+    
+    Args:
+        original_image: PIL Image of the page
+        multilingual: Whether to use multilingual OCR settings
+    
+    Returns:
+        str: Extracted text
+    """
+    # Try multiple preprocessing approaches, including aggressive methods for poor scans
+    preprocessing_methods = [
+        ("aggressive_enhanced", lambda img: aggressive_preprocess_for_poor_scans(img)),
+        ("enhanced", lambda img: preprocess_image_for_ocr(img)),
+        ("high_contrast", lambda img: ImageEnhance.Contrast(img.convert('L')).enhance(3.5)),
+        ("binary_threshold", lambda img: binarize_image(img)),
+        ("contrast_boost", lambda img: ImageEnhance.Contrast(img.convert('L')).enhance(2.0)),
+        ("sharpened", lambda img: img.convert('L').filter(ImageFilter.SHARPEN)),
+        ("original", lambda img: img.convert('L'))
+    ]
+    
+    best_text = ""
+    max_score = 0
+    
+    for method_name, preprocess_func in preprocessing_methods:
+        try:
+            processed_image = preprocess_func(original_image)
+            
+            if multilingual:
+                # Enhanced OCR configurations for different document types
+                ocr_configs = [
+                    # For certificates and formal documents
+                    {
+                        'lang': 'eng',
+                        'config': r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
+                    },
+                    # For tables and structured data
+                    {
+                        'lang': 'eng',
+                        'config': r'--oem 3 --psm 4 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
+                    },
+                    # For single text blocks
+                    {
+                        'lang': 'eng',
+                        'config': r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
+                    },
+                    # Multilingual fallback
+                    {
+                        'lang': 'eng+chi_sim+kor',
+                        'config': r'--oem 3 --psm 6'
+                    },
+                    # Basic fallback
+                    {
+                        'lang': 'eng',
+                        'config': r'--oem 3 --psm 6'
+                    }
+                ]
+                
+                for config in ocr_configs:
+                    try:
+                        text = pytesseract.image_to_string(
+                            processed_image, 
+                            lang=config['lang'], 
+                            config=config['config']
+                        )
+                        
+                        # Score the result based on content quality
+                        score = calculate_text_quality_score(text)
+                        
+                        if score > max_score:
+                            max_score = score
+                            best_text = text
+                            logger.debug(f"Best OCR result from {method_name} with {config['lang']}: score={score}")
+                            
+                    except Exception as e:
+                        logger.debug(f"OCR config failed: {e}")
+                        continue
+                        
+            else:
+                # Enhanced English-only OCR
+                configs = [
+                    r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t ',
+                    r'--oem 3 --psm 4',
+                    r'--oem 3 --psm 6'
+                ]
+                
+                for config in configs:
+                    try:
+                        text = pytesseract.image_to_string(processed_image, config=config)
+                        score = calculate_text_quality_score(text)
+                        
+                        if score > max_score:
+                            max_score = score
+                            best_text = text
+                            
+                    except Exception as e:
+                        logger.debug(f"OCR config failed: {e}")
+                        continue
+                        
+        except Exception as e:
+            logger.debug(f"Preprocessing method {method_name} failed: {e}")
+            continue
+    
+    return best_text if best_text else ""
+
 def extract_text_with_ocr(pdf_path, page_num, multilingual=True):
     """
     Extract text from PDF page using OCR with enhanced preprocessing for better accuracy.
@@ -128,107 +237,72 @@ def extract_text_with_ocr(pdf_path, page_num, multilingual=True):
         if not images:
             return ""
         
-        original_image = images[0]
-        
-        # Try multiple preprocessing approaches, including aggressive methods for poor scans
-        preprocessing_methods = [
-            ("aggressive_enhanced", lambda img: aggressive_preprocess_for_poor_scans(img)),
-            ("enhanced", lambda img: preprocess_image_for_ocr(img)),
-            ("high_contrast", lambda img: ImageEnhance.Contrast(img.convert('L')).enhance(3.5)),
-            ("binary_threshold", lambda img: binarize_image(img)),
-            ("contrast_boost", lambda img: ImageEnhance.Contrast(img.convert('L')).enhance(2.0)),
-            ("sharpened", lambda img: img.convert('L').filter(ImageFilter.SHARPEN)),
-            ("original", lambda img: img.convert('L'))
-        ]
-        
-        best_text = ""
-        max_score = 0
-        
-        for method_name, preprocess_func in preprocessing_methods:
-            try:
-                processed_image = preprocess_func(original_image)
-                
-                if multilingual:
-                    # Enhanced OCR configurations for different document types
-                    ocr_configs = [
-                        # For certificates and formal documents
-                        {
-                            'lang': 'eng',
-                            'config': r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
-                        },
-                        # For tables and structured data
-                        {
-                            'lang': 'eng',
-                            'config': r'--oem 3 --psm 4 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
-                        },
-                        # For single text blocks
-                        {
-                            'lang': 'eng',
-                            'config': r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t '
-                        },
-                        # Multilingual fallback
-                        {
-                            'lang': 'eng+chi_sim+kor',
-                            'config': r'--oem 3 --psm 6'
-                        },
-                        # Basic fallback
-                        {
-                            'lang': 'eng',
-                            'config': r'--oem 3 --psm 6'
-                        }
-                    ]
-                    
-                    for config in ocr_configs:
-                        try:
-                            text = pytesseract.image_to_string(
-                                processed_image, 
-                                lang=config['lang'], 
-                                config=config['config']
-                            )
-                            
-                            # Score the result based on content quality
-                            score = calculate_text_quality_score(text)
-                            
-                            if score > max_score:
-                                max_score = score
-                                best_text = text
-                                logger.debug(f"Best OCR result from {method_name} with {config['lang']}: score={score}")
-                                
-                        except Exception as e:
-                            logger.debug(f"OCR config failed: {e}")
-                            continue
-                            
-                else:
-                    # Enhanced English-only OCR
-                    configs = [
-                        r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-/:()[]{}.,\n\r\t ',
-                        r'--oem 3 --psm 4',
-                        r'--oem 3 --psm 6'
-                    ]
-                    
-                    for config in configs:
-                        try:
-                            text = pytesseract.image_to_string(processed_image, config=config)
-                            score = calculate_text_quality_score(text)
-                            
-                            if score > max_score:
-                                max_score = score
-                                best_text = text
-                                
-                        except Exception as e:
-                            logger.debug(f"OCR config failed: {e}")
-                            continue
-                            
-            except Exception as e:
-                logger.debug(f"Preprocessing method {method_name} failed: {e}")
-                continue
-        
-        return best_text if best_text else ""
+        return ocr_image(images[0], multilingual)
             
     except Exception as e:
         logger.error(f"OCR extraction failed for page {page_num} in {pdf_path}: {e}")
         return ""
 
+def extract_text_with_ocr_batch(pdf_path, page_nums, multilingual=True, max_workers=1):
+    """
+    Extract text from several PDF pages using OCR.
+    
+    Each run of consecutive pages is rendered with a single conversion
+    instead of one per page. The images are written to a temporary folder
+    and opened one at a time, so only the pages being OCR'd are in memory.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_nums: Page numbers (0-indexed)
+        multilingual: Whether to use multilingual OCR settings
+        max_workers: Number of pages to OCR concurrently
+    
+    Returns:
+        dict: Extracted text by page number; pages that failed map to ""
+    """
+    results = {page_num: "" for page_num in page_nums}
+    
+    # Group the pages into runs of consecutive pages
+    runs = []
+    for page_num in sorted(results):
+        if runs and page_num == runs[-1][-1] + 1:
+            runs[-1].append(page_num)
+        else:
+            runs.append([page_num])
+    
+    def ocr_page_file(page_num, image_path):
+        try:
+            with Image.open(image_path) as image:
+                image.load()
+                return page_num, ocr_image(image, multilingual)
+        except Exception as e:
+            logger.error(f"OCR extraction failed for page {page_num} in {pdf_path}: {e}")
+            return page_num, ""
+    
+    with tempfile.TemporaryDirectory() as output_folder:
+        page_files = []
+        for run in runs:
+            # Try multiple DPI settings for best results
+            for dpi in [600, 500, 400, 300]:  # Higher DPI first for scanned docs
+                try:
+                    paths = convert_from_path(
+                        pdf_path, first_page=run[0] + 1, last_page=run[-1] + 1, dpi=dpi,
+                        output_folder=output_folder, paths_only=True
+                    )
+                    if paths:
+                        logger.debug(f"Successfully converted pages {run[0] + 1}-{run[-1] + 1} at {dpi} DPI")
+                        page_files.extend(zip(run, paths))
+                        break
+                except Exception as e:
+                    logger.debug(f"DPI {dpi} failed: {e}")
+                    continue
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for page_num, text in executor.map(lambda item: ocr_page_file(*item), page_files):
+                results[page_num] = text
+    
+    return results
+
 def calculate_text_quality_score(text):
     """
     Calculate a quality score for OCR text based on various factors.
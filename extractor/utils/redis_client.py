@@ -0,0 +1,19 @@
+# redis_client.py
+"""
+Shared Redis client and the keys the extractor keeps in Redis.
+
+Used by the Celery tasks for the pending master Excel flag and by
+update_excel_with_pages for its cached page map.
+"""
+from functools import lru_cache
+import redis
+from django.conf import settings
+
+# Redis hash caching the page sidecar as json([PLATE_NO, HEAT_NO, TEST_CERT_NO]) -> Page
+PAGE_MAP_KEY = 'extractor:page_map'
+PAGE_MAP_TTL = 60 * 60 * 24 * 7
+
+@lru_cache(maxsize=1)
+def get_redis_client():
+    """Return a shared Redis client with short timeouts, so a missing server fails fast."""
+    return redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
@@ -1,185 +1,92 @@
 # update_excel_new.py
-import os
-import pandas as pd
 import logging
-from django.conf import settings
-from django.utils import timezone
+import pandas as pd
 from openpyxl import load_workbook
-from extractor.models import ExtractedData, UploadedPDF, Vendor
+from extractor.utils.master_excel import (
+    FIELD_KEYS, MASTER_BACKUP, MASTER_LOG, build_and_write, db_page_number, parquet_path,
+)
 
 logger = logging.getLogger('extractor')
 
-def update_master_excel():
+def load_master_log_pages():
     """
-    Update the master Excel file with all data from the database.
-    This function creates or updates the master.xlsx file in MEDIA_ROOT/backups/
-    Also imports page numbers from master_log.xlsx for accurate page tracking.
+    Read logs/master_log.xlsx and map every PLATE_NO, HEAT_NO and
+    TEST_CERT_NO value in it to its page number.
+    
+    The Parquet copy written alongside it is read instead when it is at
+    least as new as the workbook.
     """
-    try:
-        # Get all extracted data
-        extracted_entries = ExtractedData.objects.all().order_by('created_at')
-        
-        if not extracted_entries:
-            logger.warning("No extracted data found in database")
-            return False
+    master_log_parquet = parquet_path(MASTER_LOG)
+    master_log_data = {}
+    
+    if master_log_parquet.exists() and (
+        not MASTER_LOG.exists()
+        or master_log_parquet.stat().st_mtime >= MASTER_LOG.stat().st_mtime
+    ):
+        try:
+            logger.info("Reading page numbers from master_log.parquet")
+            df = pd.read_parquet(master_log_parquet, columns=[*FIELD_KEYS, 'Page'])
+            
+            # Create a mapping of field values to page numbers
+            pages = df['Page'].fillna(1).tolist()
+            for key in FIELD_KEYS:
+                for value, page_number in zip(df[key].tolist(), pages):
+                    if value is not None and value != '':
+                        master_log_data[str(value)] = page_number
             
-        # Try to read the master_log.xlsx file to get accurate page numbers
-        master_log_path = os.path.join(settings.BASE_DIR, 'logs', 'master_log.xlsx')
-        master_log_data = {}
-        
-        if os.path.exists(master_log_path):
+            logger.info(f"Found {len(master_log_data)} field values with page numbers in master_log.parquet")
+            return master_log_data
+        except Exception as e:
+            logger.error(f"Error reading master_log.parquet: {str(e)}")
+            master_log_data = {}
+    
+    if MASTER_LOG.exists():
+        try:
+            logger.info("Reading page numbers from master_log.xlsx")
+            # Stream the cells in read-only mode instead of loading a DataFrame
+            wb = load_workbook(MASTER_LOG, read_only=True, data_only=True)
             try:
-                logger.info("Reading page numbers from master_log.xlsx")
-                master_log_df = pd.read_excel(master_log_path)
+                rows = wb.worksheets[0].iter_rows(values_only=True)
+                headers = next(rows, ())
+                idx = {header: i for i, header in enumerate(headers)}
+                page_idx = idx.get('Page')
+                field_idxs = [idx[key] for key in ('PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO') if key in idx]
                 
                 # Create a mapping of field values to page numbers
-                for _, row in master_log_df.iterrows():
-                    plate_no = str(row.get('PLATE_NO', ''))
-                    heat_no = str(row.get('HEAT_NO', ''))
-                    test_cert_no = str(row.get('TEST_CERT_NO', ''))
-                    page_number = row.get('Page', 1)
-                    
-                    if plate_no:
-                        master_log_data[plate_no] = page_number
-                    if heat_no:
-                        master_log_data[heat_no] = page_number
-                    if test_cert_no:
-                        master_log_data[test_cert_no] = page_number
-                
-                logger.info(f"Found {len(master_log_data)} field values with page numbers in master_log.xlsx")
-            except Exception as e:
-                logger.error(f"Error reading master_log.xlsx: {str(e)}")
-        
-        # Create DataFrame from extracted data
-        data_list = []
-        
-        # Group entries by PDF and field combinations
-        pdf_entries = {}
-        
-        # First, group all entries by PDF ID and collect all values
-        for entry in extracted_entries:
-            pdf_id = entry.pdf_id
-            if pdf_id not in pdf_entries:
-                pdf_entries[pdf_id] = {
-                    'PLATE_NO': [],
-                    'HEAT_NO': [],
-                    'TEST_CERT_NO': [],
-                    'page_numbers': {}  # Store page numbers for each field value
-                }
+                for row in rows:
+                    page_number = row[page_idx] if page_idx is not None and page_idx < len(row) else None
+                    if page_number is None:
+                        page_number = 1
+                    for i in field_idxs:
+                        value = row[i] if i < len(row) else None
+                        if value is not None and value != '':
+                            master_log_data[str(value)] = page_number
+            finally:
+                wb.close()
             
-            # Store all values by field type
-            if entry.field_key in ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']:
-                pdf_entries[pdf_id][entry.field_key].append(entry.field_value)
-                # Store the page number with a unique key combining field_key and field_value
-                key = f"{entry.field_key}_{entry.field_value}"
-                pdf_entries[pdf_id]['page_numbers'][key] = entry.page_number
-        
-        # Get all PDFs that have extracted data
-        pdf_ids = list(pdf_entries.keys())
-        
-        # Create rows for each PDF with all its entries
-        sr_no = 1
-        for pdf_id in pdf_ids:
-            try:
-                pdf = UploadedPDF.objects.get(id=pdf_id)
-                vendor = pdf.vendor
-                
-                # Get all the data for this PDF
-                pdf_data = pdf_entries[pdf_id]
-                
-                # Get the max number of entries for any field type
-                max_entries = max(
-                    len(pdf_data['PLATE_NO']),
-                    len(pdf_data['HEAT_NO']),
-                    len(pdf_data['TEST_CERT_NO'])
-                )
-                
-                # If there are no entries at all, create one empty row
-                if max_entries == 0:
-                    row = {
-                        'Sr No': sr_no,
-                        'Vendor': vendor.name,
-                        'PLATE_NO': '',
-                        'HEAT_NO': '',
-                        'TEST_CERT_NO': '',
-                        'Filename': os.path.basename(pdf.file.name),
-                        'Page': 1,
-                        'Source PDF': pdf.file.name,
-                        'Created': pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        'Hash': pdf.file_hash or '',
-                        'Remarks': ''
-                    }
-                    data_list.append(row)
-                    sr_no += 1
-                    continue
-                
-                # For each entry in the max list, create a row
-                for i in range(max_entries):
-                    plate_no = pdf_data['PLATE_NO'][i] if i < len(pdf_data['PLATE_NO']) else ''
-                    heat_no = pdf_data['HEAT_NO'][i] if i < len(pdf_data['HEAT_NO']) else ''
-                    test_cert_no = pdf_data['TEST_CERT_NO'][i] if i < len(pdf_data['TEST_CERT_NO']) else ''
-                    
-                    # Try to get the page number from the database
-                    # Prioritize page numbers in this order: PLATE_NO, HEAT_NO, TEST_CERT_NO
-                    page_number = 1  # Default to 1 if no page number is found
-                    
-                    # First try to get page number from master_log.xlsx
-                    if plate_no and plate_no in master_log_data:
-                        page_number = master_log_data[plate_no]
-                    elif heat_no and heat_no in master_log_data:
-                        page_number = master_log_data[heat_no]
-                    elif test_cert_no and test_cert_no in master_log_data:
-                        page_number = master_log_data[test_cert_no]
-                    # Fall back to database page numbers if master_log data not found
-                    elif plate_no and f"PLATE_NO_{plate_no}" in pdf_data['page_numbers']:
-                        page_number = pdf_data['page_numbers'][f"PLATE_NO_{plate_no}"]
-                    elif heat_no and f"HEAT_NO_{heat_no}" in pdf_data['page_numbers']:
-                        page_number = pdf_data['page_numbers'][f"HEAT_NO_{heat_no}"]
-                    elif test_cert_no and f"TEST_CERT_NO_{test_cert_no}" in pdf_data['page_numbers']:
-                        page_number = pdf_data['page_numbers'][f"TEST_CERT_NO_{test_cert_no}"]
-                    
-                    row = {
-                        'Sr No': sr_no,
-                        'Vendor': vendor.name,
-                        'PLATE_NO': plate_no,
-                        'HEAT_NO': heat_no,
-                        'TEST_CERT_NO': test_cert_no,
-                        'Filename': os.path.basename(pdf.file.name),
-                        'Page': page_number,  # Use the actual page number from the database
-                        'Source PDF': pdf.file.name,
-                        'Created': pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        'Hash': pdf.file_hash or '',
-                        'Remarks': ''
-                    }
-                    data_list.append(row)
-                    sr_no += 1
-                
-            except UploadedPDF.DoesNotExist:
-                logger.warning(f"PDF with ID {pdf_id} not found")
-                continue
-        
-        if not data_list:
-            logger.warning("No data rows created for Excel")
-            return False
-        
-        # Create DataFrame
-        df = pd.DataFrame(data_list)
-        
-        # Save to Excel
-        backups_dir = os.path.join(settings.MEDIA_ROOT, "backups")
-        os.makedirs(backups_dir, exist_ok=True)
-        filename = os.path.join(backups_dir, "master.xlsx")
-        sheet_name = timezone.localdate().isoformat()
-        
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        logger.info(f"Successfully updated master Excel file with {len(data_list)} entries")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error updating master Excel: {str(e)}", exc_info=True)
-        return False
+            logger.info(f"Found {len(master_log_data)} field values with page numbers in master_log.xlsx")
+        except Exception as e:
+            logger.error(f"Error reading master_log.xlsx: {str(e)}")
+    
+    return master_log_data
+
+def update_master_excel():
+    """
+    Update the master Excel file with all data from the database.
+    This function creates or updates the master.xlsx file in MEDIA_ROOT/backups/
+    Also imports page numbers from master_log.xlsx for accurate page tracking.
+    """
+    master_log_data = load_master_log_pages()
+    
+    def resolve_page(page_numbers, plate_no, heat_no, test_cert_no):
+        # First try to get page number from master_log.xlsx
+        for value in (plate_no, heat_no, test_cert_no):
+            if value and value in master_log_data:
+                return master_log_data[value]
+        # Fall back to database page numbers if master_log data not found
+        return db_page_number(page_numbers, plate_no, heat_no, test_cert_no)
+    
+    return build_and_write(resolve_page, [MASTER_BACKUP])
 
 if __name__ == "__main__":
     # This allows the script to be run directly for testing
@@ -1,179 +1,106 @@
 # update_excel_with_pages.py
-import os
-import pandas as pd
-import logging
-import re
-from django.conf import settings
-from django.utils import timezone
-from openpyxl import load_workbook
-from extractor.models import ExtractedData, UploadedPDF, Vendor
 import json
+import logging
+import redis
+from extractor.utils.master_excel import FIELD_KEYS, LOGS_DIR, MASTER_BACKUP, build_and_write
+from extractor.utils.redis_client import PAGE_MAP_KEY, PAGE_MAP_TTL, get_redis_client
 
 logger = logging.getLogger('extractor')
 
-def update_master_excel_with_pages():
+# JSON-lines file in BASE_DIR/logs with one {PLATE_NO, HEAT_NO, TEST_CERT_NO, Page} per entry
+PAGES_LOG_NAME = 'extraction_pages.jsonl'
+PAGES_LOG = LOGS_DIR / PAGES_LOG_NAME
+
+def record_extraction_pages(entries):
     """
-    Update the master Excel file with all data from the database,
-    including correct page numbers from the extraction logs.
+    Append the page number of each extracted entry to the page sidecar
+    read by update_master_excel_with_pages().
     """
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    
+    with open(PAGES_LOG, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            record = {key: entry.get(key) or '' for key in FIELD_KEYS}
+            record['Page'] = entry.get('Page', 1)
+            f.write(json.dumps(record) + '\n')
+    
+    # Keep the cached page map in step. If it has expired it is left
+    # alone, so the next load rebuilds it from the complete sidecar.
     try:
-        # Get all extracted data
-        extracted_entries = ExtractedData.objects.all().order_by('created_at')
-        
-        if not extracted_entries:
-            logger.warning("No extracted data found in database")
-            return False
-        
-        # Create DataFrame from extracted data
-        data_list = []
-        
-        # Group entries by PDF and field combinations
-        pdf_entries = {}
-        
-        # First, try to read extractor log file to get page numbers
-        extractor_log_path = os.path.join(settings.BASE_DIR, 'logs', 'extractor.log')
-        page_info = {}
-        
-        if os.path.exists(extractor_log_path):
-            try:
-                with open(extractor_log_path, 'r') as f:
-                    log_content = f.read()
-                    
-                    # Find all log entries in the format "log_entry = {..."
-                    log_pattern = r'log_entry = (\{.*?\})'
-                    log_matches = re.findall(log_pattern, log_content, re.DOTALL)
-                    
-                    for match in log_matches:
-                        try:
-                            # Convert single quotes to double quotes for JSON
-                            json_str = match.replace("'", '"')
-                            entry = json.loads(json_str)
-                            
-                            # Create a key based on the field values
-                            key = (
-                                entry.get('PLATE_NO', ''),
-                                entry.get('HEAT_NO', ''),
-                                entry.get('TEST_CERT_NO', '')
-                            )
-                            
-                            # Store the page number
-                            if 'Page' in entry:
-                                page_info[key] = entry['Page']
-                        except:
-                            continue
-                logger.info(f"Found {len(page_info)} entries with page numbers in logs")
-            except Exception as e:
-                logger.error(f"Error reading log file: {str(e)}")
-        
-        # First, group all entries by PDF ID and collect all values
-        for entry in extracted_entries:
-            pdf_id = entry.pdf_id
-            if pdf_id not in pdf_entries:
-                pdf_entries[pdf_id] = {
-                    'PLATE_NO': [],
-                    'HEAT_NO': [],
-                    'TEST_CERT_NO': []
-                }
-            
-            # Store all values by field type
-            if entry.field_key in ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']:
-                pdf_entries[pdf_id][entry.field_key].append(entry.field_value)
-        
-        # Get all PDFs that have extracted data
-        pdf_ids = list(pdf_entries.keys())
-        
-        # Create rows for each PDF with all its entries
-        sr_no = 1
-        for pdf_id in pdf_ids:
-            try:
-                pdf = UploadedPDF.objects.get(id=pdf_id)
-                vendor = pdf.vendor
-                
-                # Get all the data for this PDF
-                pdf_data = pdf_entries[pdf_id]
-                
-                # Get the max number of entries for any field type
-                max_entries = max(
-                    len(pdf_data['PLATE_NO']),
-                    len(pdf_data['HEAT_NO']),
-                    len(pdf_data['TEST_CERT_NO'])
-                )
-                
-                # If there are no entries at all, create one empty row
-                if max_entries == 0:
-                    row = {
-                        'Sr No': sr_no,
-                        'Vendor': vendor.name,
-                        'PLATE_NO': '',
-                        'HEAT_NO': '',
-                        'TEST_CERT_NO': '',
-                        'Filename': os.path.basename(pdf.file.name),
-                        'Page': 1,
-                        'Source PDF': pdf.file.name,
-                        'Created': pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        'Hash': pdf.file_hash or '',
-                        'Remarks': ''
-                    }
-                    data_list.append(row)
-                    sr_no += 1
-                    continue
-                
-                # For each entry in the max list, create a row
-                for i in range(max_entries):
-                    plate_no = pdf_data['PLATE_NO'][i] if i < len(pdf_data['PLATE_NO']) else ''
-                    heat_no = pdf_data['HEAT_NO'][i] if i < len(pdf_data['HEAT_NO']) else ''
-                    test_cert_no = pdf_data['TEST_CERT_NO'][i] if i < len(pdf_data['TEST_CERT_NO']) else ''
-                    
-                    # Try to get page number from log data
-                    page_number = 1  # Default to 1
+        client = get_redis_client()
+        if client.exists(PAGE_MAP_KEY):
+            client.hset(PAGE_MAP_KEY, mapping={
+                json.dumps([entry.get(key) or '' for key in FIELD_KEYS]): json.dumps(entry.get('Page', 1))
+                for entry in entries
+            })
+            client.expire(PAGE_MAP_KEY, PAGE_MAP_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Could not update page map in Redis: {str(e)}")
+
+def load_extraction_pages():
+    """
+    Read the page sidecar and map each (PLATE_NO, HEAT_NO, TEST_CERT_NO)
+    combination to its page number.
+    
+    The map is served from Redis when cached there; otherwise it is read
+    from the sidecar file and cached for the next call.
+    """
+    try:
+        cached = get_redis_client().hgetall(PAGE_MAP_KEY)
+        if cached:
+            logger.info(f"Found {len(cached)} entries with page numbers in Redis")
+            return {tuple(json.loads(key)): json.loads(page) for key, page in cached.items()}
+    except redis.RedisError as e:
+        logger.warning(f"Could not read page map from Redis: {str(e)}")
+    
+    page_info = {}
+    
+    if PAGES_LOG.exists():
+        try:
+            with open(PAGES_LOG, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
                     
-                    # Create key to match with log data
-                    key = (plate_no, heat_no, test_cert_no)
-                    if key in page_info:
-                        page_number = page_info[key]
+                    # Create a key based on the field values
+                    key = (
+                        entry.get('PLATE_NO', ''),
+                        entry.get('HEAT_NO', ''),
+                        entry.get('TEST_CERT_NO', '')
+                    )
                     
-                    row = {
-                        'Sr No': sr_no,
-                        'Vendor': vendor.name,
-                        'PLATE_NO': plate_no,
-                        'HEAT_NO': heat_no,
-                        'TEST_CERT_NO': test_cert_no,
-                        'Filename': os.path.basename(pdf.file.name),
-                        'Page': page_number,
-                        'Source PDF': pdf.file.name,
-                        'Created': pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        'Hash': pdf.file_hash or '',
-                        'Remarks': ''
-                    }
-                    data_list.append(row)
-                    sr_no += 1
-                
-            except UploadedPDF.DoesNotExist:
-                logger.warning(f"PDF with ID {pdf_id} not found")
-                continue
-        
-        if not data_list:
-            logger.warning("No data rows created for Excel")
-            return False
-        
-        # Create DataFrame
-        df = pd.DataFrame(data_list)
-        
-        # Save to Excel
-        backups_dir = os.path.join(settings.MEDIA_ROOT, "backups")
-        os.makedirs(backups_dir, exist_ok=True)
-        filename = os.path.join(backups_dir, "master.xlsx")
-        sheet_name = timezone.localdate().isoformat()
-        
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        logger.info(f"Successfully updated master Excel file with {len(data_list)} entries, including page numbers")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error updating master Excel: {str(e)}", exc_info=True)
-        return False
+                    # Store the page number
+                    if 'Page' in entry:
+                        page_info[key] = entry['Page']
+            logger.info(f"Found {len(page_info)} entries with page numbers in {PAGES_LOG_NAME}")
+        except Exception as e:
+            logger.error(f"Error reading page log file: {str(e)}")
+    
+    if page_info:
+        try:
+            client = get_redis_client()
+            client.hset(PAGE_MAP_KEY, mapping={
+                json.dumps(list(key)): json.dumps(page) for key, page in page_info.items()
+            })
+            client.expire(PAGE_MAP_KEY, PAGE_MAP_TTL)
+        except redis.RedisError as e:
+            logger.warning(f"Could not cache page map in Redis: {str(e)}")
+    
+    return page_info
+
+def update_master_excel_with_pages():
+    """
+    Update the master Excel file with all data from the database,
+    including correct page numbers recorded at extraction time.
+    """
+    page_info = load_extraction_pages()
+    
+    def resolve_page(page_numbers, plate_no, heat_no, test_cert_no):
+        return page_info.get((plate_no, heat_no, test_cert_no))
+    
+    return build_and_write(resolve_page, [MASTER_BACKUP])
 
 if __name__ == "__main__":
     # This allows the script to be run directly for testing
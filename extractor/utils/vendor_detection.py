@@ -8,17 +8,332 @@ using OCR and template matching logic.
 import os
 import re
 import logging
+from collections import defaultdict
+from functools import lru_cache
 from typing import Tuple, Optional, Dict, Any
 
+import ahocorasick
 import pdfplumber
-from .ocr_helper import extract_text_with_ocr
+from django.core.cache import cache
+from PyPDF2 import PdfReader
+from .ocr_helper import extract_text_with_ocr_batch
 from .extractor import detect_multilingual_content
 from ..models import Vendor
 
 logger = logging.getLogger('extractor.vendor_detection')
 
+# Minimum confidence for a detected vendor
+MIN_CONFIDENCE = 0.4
 
-def extract_pdf_text(pdf_path: str, max_pages: int = 3) -> str:
+# Seconds a selected vendor's lookup is reused by validate_vendor_selection()
+VENDOR_CACHE_TIMEOUT = 300
+
+# Characters from the start of the text scored before falling back to the whole text
+HEADER_SCAN_LENGTH = 4096
+
+# Vendor detection patterns with their confidence weights. They are
+# matched against lowercased text, so they must be lowercase too.
+VENDOR_PATTERNS = {
+    'posco': {
+        'patterns': [
+            (r'posco\s+international', 0.9),
+            (r'posco', 0.7),
+            (r'pohang\s+iron\s+&?\s*steel', 0.8),
+            (r'포스코', 0.9),  # POSCO in Korean
+        ],
+        'negative_patterns': [
+            r'not\s+posco',
+            r'ex-posco',
+        ]
+    },
+    'tata_steel': {
+        'patterns': [
+            (r'tata\s+steel', 0.9),
+            (r'tata\s+group', 0.6),
+            (r'jamshedpur', 0.7),
+        ],
+        'negative_patterns': [
+            r'not\s+tata',
+            r'ex-tata',
+        ]
+    },
+    'citic_steel': {
+        'patterns': [
+            (r'citic\s+steel', 0.9),
+            (r'citic\s+group', 0.7),
+            (r'中信钢铁', 0.9),  # CITIC Steel in Chinese
+            (r'中信集团', 0.7),  # CITIC Group in Chinese
+        ],
+        'negative_patterns': [
+            r'not\s+citic',
+        ]
+    },
+    'jfe_steel': {
+        'patterns': [
+            (r'jfe\s+steel', 0.9),
+            (r'jfe\s+holdings', 0.8),
+            (r'japan\s+iron\s+&?\s*steel', 0.7),
+            (r'川崎製鉄', 0.8),  # Kawasaki Steel in Japanese
+            (r'jfe', 0.6),
+        ],
+        'negative_patterns': [
+            r'not\s+jfe',
+            r'ex-jfe',
+        ]
+    },
+    'nippon_steel': {
+        'patterns': [
+            (r'nippon\s+steel', 0.9),
+            (r'新日本製鐵', 0.9),  # Nippon Steel in Japanese
+            (r'新日鐵', 0.8),     # Short form in Japanese
+        ],
+        'negative_patterns': [
+            r'not\s+nippon',
+            r'ex-nippon',
+        ]
+    },
+    'baosteel': {
+        'patterns': [
+            (r'baosteel', 0.9),
+            (r'bao\s+steel', 0.8),
+            (r'宝钢', 0.9),      # Baosteel in Chinese
+            (r'宝山钢铁', 0.9),  # Baoshan Iron & Steel in Chinese
+        ],
+        'negative_patterns': [
+            r'not\s+baosteel',
+            r'ex-baosteel',
+        ]
+    }
+}
+
+# Patterns compiled once at import, each with the name of its group in
+# the combined patterns below:
+# {vendor_id: {'patterns': [(name, pattern, weight)], 'negative_patterns': [(name, pattern)]}}
+COMPILED_VENDOR_PATTERNS = {
+    vendor_id: {
+        'patterns': [
+            (f'{vendor_id}_{i}', re.compile(pattern), weight)
+            for i, (pattern, weight) in enumerate(config['patterns'])
+        ],
+        'negative_patterns': [
+            (f'{vendor_id}_neg_{i}', re.compile(neg_pattern))
+            for i, neg_pattern in enumerate(config.get('negative_patterns', []))
+        ],
+    }
+    for vendor_id, config in VENDOR_PATTERNS.items()
+}
+
+# Every pattern by group name
+GROUP_PATTERNS = {
+    name: pattern
+    for config in COMPILED_VENDOR_PATTERNS.values()
+    for name, pattern, *_ in config['patterns'] + config['negative_patterns']
+}
+
+
+# Characters that make a pattern need the regex engine
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+
+def pattern_keyword(pattern: str) -> Optional[str]:
+    """
+    Return the literal keyword a pattern is equivalent to once runs of
+    whitespace in the text are collapsed to single spaces, or None if the
+    pattern needs the regex engine.
+    """
+    keyword = pattern.replace(r'\s+', ' ')
+    if REGEX_METACHARACTERS.intersection(keyword):
+        return None
+    return keyword
+
+
+def build_keyword_automaton():
+    """
+    Build an Aho-Corasick automaton over the literal vendor patterns, with
+    (keyword, group names) as the value of each keyword.
+    
+    Returns:
+        Tuple of (automaton, names of the patterns that are not literal)
+    """
+    automaton = ahocorasick.Automaton()
+    residual_names = []
+    
+    for name, pattern in GROUP_PATTERNS.items():
+        keyword = pattern_keyword(pattern.pattern)
+        if keyword is None:
+            residual_names.append(name)
+            continue
+        _, names = automaton.get(keyword, (keyword, ()))
+        automaton.add_word(keyword, (keyword, names + (name,)))
+    
+    if len(automaton):
+        automaton.make_automaton()
+    return automaton, residual_names
+
+
+def build_combined_pattern(names):
+    """
+    Join the named patterns into one alternation with a named group per
+    pattern, so a single scan finds the matches of all of them.
+    """
+    return re.compile('|'.join(f'(?P<{name}>{GROUP_PATTERNS[name].pattern})' for name in names))
+
+
+# Literal patterns are found in one pass by the automaton; the few that
+# need the regex engine share one combined pattern
+KEYWORD_AUTOMATON, RESIDUAL_NAMES = build_keyword_automaton()
+RESIDUAL_PATTERN = build_combined_pattern(RESIDUAL_NAMES) if RESIDUAL_NAMES else None
+
+
+def count_keyword_matches(text: str) -> Dict[str, int]:
+    """
+    Count the matches of every literal pattern in text, which must already
+    be lowercased with its whitespace runs collapsed to single spaces.
+    """
+    counts = defaultdict(int)
+    if KEYWORD_AUTOMATON.kind != ahocorasick.AHOCORASICK:
+        return counts
+    
+    last_end = {}
+    for end, (keyword, names) in KEYWORD_AUTOMATON.iter(text):
+        # Like findall(), don't count overlapping matches of the same keyword
+        if end - len(keyword) < last_end.get(keyword, -1):
+            continue
+        last_end[keyword] = end
+        for name in names:
+            counts[name] += 1
+    return counts
+
+
+@lru_cache(maxsize=1024)
+def nested_matches(combined_pattern: re.Pattern, name: str, matched: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Count the other groups of combined_pattern matching inside the text
+    matched by group name, e.g. 'posco' inside 'posco international'.
+    """
+    nested = []
+    for other in combined_pattern.groupindex:
+        if other != name:
+            count = sum(1 for _ in GROUP_PATTERNS[other].finditer(matched))
+            if count:
+                nested.append((other, count))
+    return tuple(nested)
+
+
+def count_matches(combined_pattern: re.Pattern, text: str) -> Dict[str, int]:
+    """
+    Count the matches of every group of combined_pattern in text with one scan.
+    
+    The scan does not overlap matches, so patterns matching inside another
+    pattern's match are counted from the matched text; the counts equal
+    running findall() once per pattern.
+    """
+    counts = defaultdict(int)
+    for match in combined_pattern.finditer(text):
+        name = match.lastgroup
+        counts[name] += 1
+        for other, count in nested_matches(combined_pattern, name, match.group()):
+            counts[other] += count
+    return counts
+
+
+# Content stream operators that show text; any other page has no text layer
+TEXT_SHOWING_OPERATORS = re.compile(rb"T[jJ]|['\"]")
+
+
+def resources_may_have_text(resources, seen) -> bool:
+    """
+    Check the form XObjects in a resource dictionary, and the forms nested
+    in them, for text-showing operators.
+    """
+    xobjects = resources.get('/XObject') if resources is not None else None
+    if not xobjects:
+        return False
+    
+    for xobject_ref in xobjects.get_object().values():
+        xobject = xobject_ref.get_object()
+        if xobject.get('/Subtype') != '/Form' or id(xobject) in seen:
+            continue
+        seen.add(id(xobject))
+        if TEXT_SHOWING_OPERATORS.search(xobject.get_data()):
+            return True
+        form_resources = xobject.get('/Resources')
+        if resources_may_have_text(form_resources.get_object() if form_resources is not None else None, seen):
+            return True
+    return False
+
+
+def page_may_have_text(page) -> bool:
+    """
+    Cheaply check whether a PyPDF2 page can have a text layer by searching
+    its raw content streams for text-showing operators, without the layout
+    analysis pdfplumber does. Scanned pages fail this check, so they can
+    go straight to OCR. Anything unexpected counts as having text.
+    """
+    try:
+        contents = page.get_contents()
+        if contents is not None and TEXT_SHOWING_OPERATORS.search(contents.get_data()):
+            return True
+        resources = page.get('/Resources')
+        return resources_may_have_text(resources.get_object() if resources is not None else None, set())
+    except Exception as e:
+        logger.debug(f"Could not probe page for text: {str(e)}")
+        return True
+
+
+@lru_cache(maxsize=256)
+def read_pdf_text(pdf_path: str, mtime_ns: int, size: int, max_pages: int) -> Tuple[str, int]:
+    """
+    Extract text from the first max_pages pages of a PDF, returning the
+    combined text and the number of pages that produced text.
+    
+    Pages without usable text are OCR'd together at the end, concurrently,
+    since OCR runs outside the GIL. Results are cached per file identity (path, modification time and
+    size), so validating and detecting the same file only parses it once.
+    Errors are raised rather than cached.
+    """
+    # Probe for text layers first, so scanned pages never reach pdfplumber
+    try:
+        reader = PdfReader(pdf_path)
+        pages_to_check = min(len(reader.pages), max_pages)
+        text_layers = [page_may_have_text(reader.pages[page_idx]) for page_idx in range(pages_to_check)]
+    except Exception as e:
+        logger.warning(f"Could not probe {pdf_path} for text layers: {str(e)}")
+        with pdfplumber.open(pdf_path) as pdf:
+            pages_to_check = min(len(pdf.pages), max_pages)
+        text_layers = [True] * pages_to_check
+    
+    if not pages_to_check:
+        return "", 0
+    
+    texts = [None] * pages_to_check
+    if any(text_layers):
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_idx, has_text in enumerate(text_layers):
+                if has_text:
+                    # Try to extract text normally first
+                    texts[page_idx] = pdf.pages[page_idx].extract_text()
+    
+    # If no text or very little text, use OCR
+    ocr_pages = [page_idx for page_idx, text in enumerate(texts) if not text or len(text.strip()) < 50]
+    if ocr_pages:
+        logger.info(f"Pages {', '.join(str(page_idx + 1) for page_idx in ocr_pages)}: Using OCR fallback for text extraction")
+        ocr_texts = extract_text_with_ocr_batch(
+            pdf_path, ocr_pages, max_workers=min(len(ocr_pages), os.cpu_count() or 1)
+        )
+        for page_idx in ocr_pages:
+            texts[page_idx] = ocr_texts[page_idx]
+    
+    parts = [
+        f"\n--- Page {page_idx + 1} ---\n{text}\n"
+        for page_idx, text in enumerate(texts)
+        if text
+    ]
+    
+    return "".join(parts).strip(), len(parts)
+
+
+def extract_pdf_text(pdf_path: str, max_pages: int = 3) -> Tuple[str, int]:
     """
     Extract text from the first few pages of a PDF for vendor detection.
     
@@ -27,159 +342,105 @@ def extract_pdf_text(pdf_path: str, max_pages: int = 3) -> str:
         max_pages: Maximum number of pages to process (default: 3)
     
     Returns:
-        Combined text from the specified pages
+        Tuple of (combined text from the specified pages, number of pages
+        that produced text)
     """
     try:
-        combined_text = ""
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            pages_to_check = min(len(pdf.pages), max_pages)
-            
-            for page_idx in range(pages_to_check):
-                page = pdf.pages[page_idx]
-                
-                # Try to extract text normally first
-                text = page.extract_text()
-                
-                # If no text or very little text, use OCR
-                if not text or len(text.strip()) < 50:
-                    logger.info(f"Page {page_idx + 1}: Using OCR fallback for text extraction")
-                    text = extract_text_with_ocr(pdf_path, page_idx)
-                
-                if text:
-                    combined_text += f"\n--- Page {page_idx + 1} ---\n{text}\n"
-        
-        return combined_text.strip()
+        stat = os.stat(pdf_path)
+        return read_pdf_text(pdf_path, stat.st_mtime_ns, stat.st_size, max_pages)
         
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_path}: {str(e)}")
-        return ""
+        return "", 0
 
 
-def detect_vendor_from_text(text: str) -> Tuple[Optional[str], float]:
+def score_vendors(text_lower: str) -> Dict[str, float]:
     """
-    Detect vendor from extracted PDF text using pattern matching.
-    
-    Args:
-        text: Extracted text from PDF
+    Score every vendor with at least one pattern match in lowercased text.
     
     Returns:
-        Tuple of (vendor_id, confidence_score)
-        vendor_id: The detected vendor ID or None if no match
-        confidence_score: Confidence level (0.0 to 1.0)
+        Dictionary of vendor_id to score (0.0 to 1.0)
     """
-    if not text:
-        return None, 0.0
+    vendor_scores = {}
     
-    text_lower = text.lower()
-    
-    # Vendor detection patterns with their confidence weights
-    vendor_patterns = {
-        'posco': {
-            'patterns': [
-                (r'posco\s+international', 0.9),
-                (r'posco', 0.7),
-                (r'pohang\s+iron\s+&?\s*steel', 0.8),
-                (r'포스코', 0.9),  # POSCO in Korean
-            ],
-            'negative_patterns': [
-                r'not\s+posco',
-                r'ex-posco',
-            ]
-        },
-        'tata_steel': {
-            'patterns': [
-                (r'tata\s+steel', 0.9),
-                (r'tata\s+group', 0.6),
-                (r'jamshedpur', 0.7),
-            ],
-            'negative_patterns': [
-                r'not\s+tata',
-                r'ex-tata',
-            ]
-        },
-        'citic_steel': {
-            'patterns': [
-                (r'citic\s+steel', 0.9),
-                (r'citic\s+group', 0.7),
-                (r'中信钢铁', 0.9),  # CITIC Steel in Chinese
-                (r'中信集团', 0.7),  # CITIC Group in Chinese
-            ],
-            'negative_patterns': [
-                r'not\s+citic',
-            ]
-        },
-        'jfe_steel': {
-            'patterns': [
-                (r'jfe\s+steel', 0.9),
-                (r'jfe\s+holdings', 0.8),
-                (r'japan\s+iron\s+&?\s*steel', 0.7),
-                (r'川崎製鉄', 0.8),  # Kawasaki Steel in Japanese
-                (r'JFE', 0.6),
-            ],
-            'negative_patterns': [
-                r'not\s+jfe',
-                r'ex-jfe',
-            ]
-        },
-        'nippon_steel': {
-            'patterns': [
-                (r'nippon\s+steel', 0.9),
-                (r'新日本製鐵', 0.9),  # Nippon Steel in Japanese
-                (r'新日鐵', 0.8),     # Short form in Japanese
-            ],
-            'negative_patterns': [
-                r'not\s+nippon',
-                r'ex-nippon',
-            ]
-        },
-        'baosteel': {
-            'patterns': [
-                (r'baosteel', 0.9),
-                (r'bao\s+steel', 0.8),
-                (r'宝钢', 0.9),      # Baosteel in Chinese
-                (r'宝山钢铁', 0.9),  # Baoshan Iron & Steel in Chinese
-            ],
-            'negative_patterns': [
-                r'not\s+baosteel',
-                r'ex-baosteel',
-            ]
-        }
-    }
+    # Normalize by text length (longer texts might have more false positives)
+    text_length = len(text_lower)
+    text_length_factor = min(1.0, 1000 / text_length) if text_length > 1000 else 1.0
     
-    vendor_scores = {}
+    # One automaton pass for the literal patterns of all vendors, one
+    # regex scan for the rest
+    counts = count_keyword_matches(' '.join(text_lower.split()))
+    if RESIDUAL_PATTERN is not None:
+        for name, count in count_matches(RESIDUAL_PATTERN, text_lower).items():
+            counts[name] += count
+    
+    # Per-match debug messages are only formatted when they will be emitted
+    debug = logger.isEnabledFor(logging.DEBUG)
     
     # Check each vendor's patterns
-    for vendor_id, config in vendor_patterns.items():
+    for vendor_id, config in COMPILED_VENDOR_PATTERNS.items():
         score = 0.0
         match_count = 0
         
         # Check positive patterns
-        for pattern, weight in config['patterns']:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE | re.MULTILINE)
+        for name, pattern, weight in config['patterns']:
+            matches = counts.get(name, 0)
             if matches:
-                score += weight * len(matches)
-                match_count += len(matches)
-                logger.debug(f"Vendor {vendor_id}: Found {len(matches)} matches for '{pattern}' (weight: {weight})")
+                score += weight * matches
+                match_count += matches
+                if debug:
+                    logger.debug(f"Vendor {vendor_id}: Found {matches} matches for '{pattern.pattern}' (weight: {weight})")
         
-        # Check negative patterns (reduce score)
-        for neg_pattern in config.get('negative_patterns', []):
-            neg_matches = re.findall(neg_pattern, text_lower, re.IGNORECASE | re.MULTILINE)
-            if neg_matches:
-                score -= 0.5 * len(neg_matches)
-                logger.debug(f"Vendor {vendor_id}: Found {len(neg_matches)} negative matches for '{neg_pattern}'")
+        # Vendors without a positive match get no score, whatever their negatives
+        if match_count == 0:
+            continue
+        
+        # Check negative patterns (reduce score once per pattern present)
+        for name, neg_pattern in config['negative_patterns']:
+            if counts.get(name):
+                score -= 0.5
+                if debug:
+                    logger.debug(f"Vendor {vendor_id}: Found negative match for '{neg_pattern.pattern}'")
         
         # Normalize score based on text length and match count
-        if match_count > 0:
-            # Bonus for multiple matches
-            if match_count > 1:
-                score *= 1.2
-            
-            # Normalize by text length (longer texts might have more false positives)
-            text_length_factor = min(1.0, 1000 / len(text)) if len(text) > 1000 else 1.0
-            score *= text_length_factor
-            
-            vendor_scores[vendor_id] = min(score, 1.0)  # Cap at 1.0
+        # Bonus for multiple matches
+        if match_count > 1:
+            score *= 1.2
+        
+        score *= text_length_factor
+        
+        vendor_scores[vendor_id] = min(score, 1.0)  # Cap at 1.0
+        
+        # A capped score can't be beaten and max() below keeps the first
+        # of equal scores, so the remaining vendors can't change the result
+        if vendor_scores[vendor_id] >= 1.0:
+            break
+    
+    return vendor_scores
+
+
+def detect_vendor_from_text(text: str) -> Tuple[Optional[str], float]:
+    """
+    Detect vendor from extracted PDF text using pattern matching.
+    
+    Vendor names are almost always in the letterhead, so only the start of
+    the text is scored first; the whole text is only scored when that
+    finds no vendor with sufficient confidence.
+    
+    Args:
+        text: Extracted text from PDF
+    
+    Returns:
+        Tuple of (vendor_id, confidence_score)
+        vendor_id: The detected vendor ID or None if no match
+        confidence_score: Confidence level (0.0 to 1.0)
+    """
+    if not text:
+        return None, 0.0
+    
+    vendor_scores = score_vendors(text[:HEADER_SCAN_LENGTH].lower())
+    if len(text) > HEADER_SCAN_LENGTH and max(vendor_scores.values(), default=0.0) < MIN_CONFIDENCE:
+        vendor_scores = score_vendors(text.lower())
     
     # Find the vendor with the highest score
     if vendor_scores:
@@ -187,7 +448,7 @@ def detect_vendor_from_text(text: str) -> Tuple[Optional[str], float]:
         vendor_id, confidence = best_vendor
         
         # Only return if confidence is above threshold
-        if confidence >= 0.4:  # Minimum confidence threshold
+        if confidence >= MIN_CONFIDENCE:
             logger.info(f"Detected vendor: {vendor_id} (confidence: {confidence:.2f})")
             return vendor_id, confidence
     
@@ -195,6 +456,51 @@ def detect_vendor_from_text(text: str) -> Tuple[Optional[str], float]:
     return None, 0.0
 
 
+@lru_cache(maxsize=128)
+def detect_vendor_cached(pdf_path: str, mtime_ns: int, size: int) -> Tuple[Optional[str], float, Tuple[Tuple[str, Any], ...]]:
+    """
+    Detect the vendor of a PDF, cached per file identity (path,
+    modification time and size) like read_pdf_text().
+    
+    Returns the metadata as a tuple of items, so the cached value can't be
+    changed by callers. Errors are raised rather than cached.
+    """
+    metadata = {
+        'multilingual_detected': False,
+        'fragmentation_detected': False,
+        'pages_processed': 0,
+        'text_length': 0,
+        'detection_method': 'pattern_matching'
+    }
+    
+    # Extract text from the first few pages
+    text, pages_processed = read_pdf_text(pdf_path, mtime_ns, size, 3)
+    metadata['text_length'] = len(text)
+    metadata['pages_processed'] = pages_processed
+    
+    if not text:
+        logger.warning(f"No text extracted from PDF: {pdf_path}")
+        return None, 0.0, tuple(metadata.items())
+    
+    # Check for multilingual content; pure ASCII text has no CJK characters,
+    # so the analyzer is only run on text that could be multilingual
+    if text.isascii():
+        is_multilingual, has_fragmentation = False, False
+    else:
+        is_multilingual, has_fragmentation = detect_multilingual_content(text)
+    metadata['multilingual_detected'] = is_multilingual
+    metadata['fragmentation_detected'] = has_fragmentation
+    
+    if is_multilingual:
+        logger.info("Multilingual content detected - using enhanced detection")
+        metadata['detection_method'] = 'multilingual_pattern_matching'
+    
+    # Detect vendor using pattern matching
+    vendor_id, confidence = detect_vendor_from_text(text)
+    
+    return vendor_id, confidence, tuple(metadata.items())
+
+
 def detect_vendor_from_pdf(pdf_path: str) -> Tuple[Optional[str], float, Dict[str, Any]]:
     """
     Main function to detect vendor from a PDF file.
@@ -208,44 +514,40 @@ def detect_vendor_from_pdf(pdf_path: str) -> Tuple[Optional[str], float, Dict[st
         confidence_score: Confidence level (0.0 to 1.0)
         metadata: Additional information about the detection process
     """
-    metadata = {
-        'multilingual_detected': False,
-        'fragmentation_detected': False,
-        'pages_processed': 0,
-        'text_length': 0,
-        'detection_method': 'pattern_matching'
-    }
-    
     try:
-        # Extract text from the first few pages
-        text = extract_pdf_text(pdf_path, max_pages=3)
-        metadata['text_length'] = len(text)
-        metadata['pages_processed'] = text.count('--- Page') if text else 0
-        
-        if not text:
-            logger.warning(f"No text extracted from PDF: {pdf_path}")
-            return None, 0.0, metadata
-        
-        # Check for multilingual content
-        is_multilingual, has_fragmentation = detect_multilingual_content(text)
-        metadata['multilingual_detected'] = is_multilingual
-        metadata['fragmentation_detected'] = has_fragmentation
-        
-        if is_multilingual:
-            logger.info("Multilingual content detected - using enhanced detection")
-            metadata['detection_method'] = 'multilingual_pattern_matching'
-        
-        # Detect vendor using pattern matching
-        vendor_id, confidence = detect_vendor_from_text(text)
-        
-        return vendor_id, confidence, metadata
+        stat = os.stat(pdf_path)
+        vendor_id, confidence, metadata = detect_vendor_cached(pdf_path, stat.st_mtime_ns, stat.st_size)
+        return vendor_id, confidence, dict(metadata)
         
     except Exception as e:
         logger.error(f"Error detecting vendor from PDF {pdf_path}: {str(e)}")
-        metadata['error'] = str(e)
+        metadata = {
+            'multilingual_detected': False,
+            'fragmentation_detected': False,
+            'pages_processed': 0,
+            'text_length': 0,
+            'detection_method': 'pattern_matching',
+            'error': str(e)
+        }
         return None, 0.0, metadata
 
 
+def get_vendor_identity(vendor_id: str) -> Tuple[str, str, str]:
+    """
+    Return (vendor key, database id, name) of a vendor as lowercase strings,
+    ready to compare against a detected vendor. Cached for
+    VENDOR_CACHE_TIMEOUT seconds so repeated validations against the same
+    vendor skip the query. Raises Vendor.DoesNotExist for unknown vendors,
+    which are not cached.
+    """
+    def load():
+        vendor = Vendor.objects.get(id=vendor_id)
+        vendor_key = getattr(vendor, 'vendor_id', vendor.id)
+        return str(vendor_key).lower(), str(vendor.id).lower(), str(vendor.name).lower()
+    
+    return cache.get_or_set(f'vendor_identity_lower:{vendor_id}', load, VENDOR_CACHE_TIMEOUT)
+
+
 def validate_vendor_selection(pdf_path: str, selected_vendor_id: str) -> Dict[str, Any]:
     """
     Validate if the selected vendor matches the detected vendor from the PDF.
@@ -267,8 +569,7 @@ def validate_vendor_selection(pdf_path: str, selected_vendor_id: str) -> Dict[st
     try:
         # Get the selected vendor object to validate it exists
         try:
-            selected_vendor = Vendor.objects.get(id=selected_vendor_id)
-            selected_vendor_key = getattr(selected_vendor, 'vendor_id', selected_vendor.id)
+            selected_vendor_key, selected_vendor_db_id, selected_vendor_name = get_vendor_identity(selected_vendor_id)
         except Vendor.DoesNotExist:
             return {
                 'is_valid': False,
@@ -293,10 +594,11 @@ def validate_vendor_selection(pdf_path: str, selected_vendor_id: str) -> Dict[st
         
         # Check if detected vendor matches selected vendor
         # Handle both cases: vendor.id and vendor.vendor_id
+        detected_vendor_lower = detected_vendor.lower()
         vendor_matches = (
-            str(detected_vendor).lower() == str(selected_vendor_key).lower() or
-            str(detected_vendor).lower() == str(selected_vendor.id).lower() or
-            detected_vendor in str(selected_vendor.name).lower()
+            detected_vendor_lower == selected_vendor_key or
+            detected_vendor_lower == selected_vendor_db_id or
+            detected_vendor in selected_vendor_name
         )
         
         if vendor_matches:
@@ -1,10 +1,13 @@
 import os
 import io
 import zipfile
+import shutil
 import logging
 import tempfile
+import time
 from datetime import datetime
-from django.http import HttpResponse, FileResponse
+from functools import lru_cache
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from extractor.models import UploadedPDF, ExtractedData
@@ -12,9 +15,205 @@ import pandas as pd
 
 logger = logging.getLogger(__name__)
 
-def create_download_package():
+def iter_pdf_files(pdf_dir):
+    """
+    Yield the path of every .pdf file under pdf_dir, in the same order as
+    os.walk(). Uses os.scandir() directly, so directory entries are typed
+    from the listing itself instead of being stat'ed again.
+    """
+    stack = [pdf_dir]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk(), symlinked directories are not followed
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.pdf'):
+                    yield entry.path
+        # Reversed, so subdirectories are popped in listing order
+        stack.extend(reversed(subdirs))
+
+# Deflate level of the Excel file, the only compressed member; it is small,
+# so the best ratio costs little time. PDFs are stored uncompressed.
+EXCEL_COMPRESSION_LEVEL = 9
+
+# Deflate level of the compressible members of the download view packages
+# (Excel, README and text files); level 1 is several times faster than the
+# default 6 and the files are small
+PACKAGE_COMPRESSION_LEVEL = 1
+
+# Files that are already compressed and are stored in archives as-is, since
+# deflating them again costs CPU time and saves next to nothing
+STORED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.gz', '.xz', '.zip')
+
+# Chunk size for copying files into archives; ZipFile.write() uses 8 KB
+COPY_BUFFER_SIZE = 1 << 20
+
+# Seconds between progress messages while packaging PDFs
+PROGRESS_LOG_INTERVAL = 2.0
+
+def copy_into_zip(zip_file, path, arcname, compress_type=zipfile.ZIP_STORED):
+    """
+    Add the file at path to zip_file as arcname, like ZipFile.write() but
+    copying in COPY_BUFFER_SIZE chunks.
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    zinfo.compress_type = compress_type
+    # The source is opened first, so an unreadable file adds no member
+    with open(path, 'rb') as src, zip_file.open(zinfo, 'w') as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+@lru_cache(maxsize=4)
+def excel_file_candidates(media_root, base_dir):
+    """Potential master Excel file paths, in order of preference."""
+    return (
+        os.path.join(media_root, "master_log.xlsx"),
+        os.path.join(base_dir, "logs", "master_log.xlsx"),
+        os.path.join(media_root, "logs", "master_log.xlsx"),
+        os.path.join(media_root, "master.xlsx"),
+        os.path.join(media_root, "all_extracted_data.xlsx")
+    )
+
+class DeleteOnCloseFile(io.FileIO):
+    """
+    Binary file that removes itself when closed. Used for temp files served
+    with FileResponse, which closes the file once the response has been sent.
+    """
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            try:
+                os.unlink(self.name)
+            except OSError:
+                logger.warning(f"Failed to remove temporary file: {self.name}")
+
+def find_excel_file(media_root, base_dir):
+    """
+    Return the first existing master Excel file for the package, or None.
+    Existence is checked on every call, since the master Excel is created
+    and replaced while the server runs.
+    """
+    for path in excel_file_candidates(media_root, base_dir):
+        if os.path.isfile(path):
+            logger.info(f"Found Excel file at: {path}")
+            return path
+    return None
+
+class ZipStreamBuffer:
+    """
+    Write-only file object for ZipFile. Written bytes are held until
+    drain() takes them, so an archive can be sent while it is built.
+    """
+    def __init__(self):
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def stream_package(excel_file, pdf_paths, media_root, compression_level=EXCEL_COMPRESSION_LEVEL):
+    """
+    Generator yielding a ZIP archive of excel_file and pdf_paths, one chunk
+    per member, so only a single member is held in memory at a time.
+    Files that can't be read are logged and left out.
+    """
+    sink = ZipStreamBuffer()
+    
+    # ZipFile can't seek back in the sink, so it writes sizes and CRCs
+    # in a data descriptor after each member
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level) as zip_file:
+        if excel_file:
+            try:
+                zip_file.write(excel_file, arcname=os.path.basename(excel_file))
+            except Exception as e:
+                logger.error(f"Error reading Excel file: {str(e)}")
+            yield sink.drain()
+        
+        pdf_count = 0
+        for pdf_path in pdf_paths:
+            try:
+                # PDFs are already compressed internally, so they are stored as-is
+                rel_path = os.path.relpath(pdf_path, media_root)
+                copy_into_zip(zip_file, pdf_path, rel_path)
+                pdf_count += 1
+            except Exception as e:
+                logger.error(f"Error reading PDF file {os.path.basename(pdf_path)}: {str(e)}")
+            yield sink.drain()
+    
+    # Closing the archive wrote the central directory
+    yield sink.drain()
+    logger.info(f"Streamed ZIP package with {pdf_count} PDFs")
+
+class ClosingStream:
+    """
+    Iterable over the chunks of stream that calls on_close when closed.
+
+    StreamingHttpResponse closes the iterable it streams once the response
+    is closed, whether or not streaming started, unlike a generator's
+    finally block, which only runs once the generator has started. Used to
+    remove the temporary files a streamed archive is built from.
+    """
+    def __init__(self, stream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+    
+    def __iter__(self):
+        return iter(self.stream)
+    
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self.on_close()
+
+def stream_directory(directory, extra_files=()):
+    """
+    Generator yielding a ZIP archive of every file under directory, with
+    paths relative to it, one chunk per member. extra_files are
+    (arcname, text) pairs added after the files. Files that can't be read
+    are logged and left out.
+    
+    Files with STORED_EXTENSIONS are stored, the rest are deflated at
+    PACKAGE_COMPRESSION_LEVEL.
+    """
+    sink = ZipStreamBuffer()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=PACKAGE_COMPRESSION_LEVEL) as zip_file:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                file_path = os.path.join(root, file)
+                arcname = os.path.relpath(file_path, directory)
+                try:
+                    if file.lower().endswith(STORED_EXTENSIONS):
+                        copy_into_zip(zip_file, file_path, arcname)
+                    else:
+                        zip_file.write(file_path, arcname=arcname)
+                except Exception as e:
+                    logger.error(f"Error adding file {file} to ZIP: {str(e)}")
+                yield sink.drain()
+        
+        for arcname, content in extra_files:
+            zip_file.writestr(arcname, content)
+    
+    # Closing the archive wrote the central directory
+    yield sink.drain()
+
+def create_download_package(compression_level=EXCEL_COMPRESSION_LEVEL):
     """
     Creates a ZIP archive containing the master Excel file and all extracted PDFs.
+    compression_level is the deflate level (0-9) of the Excel file; PDFs are stored.
     Returns a tuple of (success, result) where result is either the file buffer or an error message.
     """
     # Track success/failure stats
@@ -33,26 +232,10 @@ def create_download_package():
         media_root = os.path.abspath(settings.MEDIA_ROOT)
         base_dir = os.path.abspath(settings.BASE_DIR)
         
-        # Try multiple potential Excel file paths
-        excel_paths = [
-            os.path.join(media_root, "master_log.xlsx"),
-            os.path.join(base_dir, "logs", "master_log.xlsx"),
-            os.path.join(media_root, "logs", "master_log.xlsx"),
-            os.path.join(media_root, "master.xlsx"),
-            os.path.join(media_root, "all_extracted_data.xlsx")
-        ]
-        
         # Find first existing Excel file
-        excel_file = None
-        for path in excel_paths:
-            if os.path.exists(path) and os.path.isfile(path):
-                excel_file = path
-                logger.info(f"Found Excel file at: {excel_file}")
-                break
-                
+        excel_file = find_excel_file(media_root, base_dir)
         if not excel_file:
             logger.warning(f"Excel file not found in any of the expected locations")
-            excel_file = excel_paths[0]  # Default for error reporting
             
         pdf_dir = os.path.join(media_root, "extracted")
         
@@ -62,15 +245,11 @@ def create_download_package():
         # Create in-memory buffer
         buffer = io.BytesIO()
         
-        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level) as zip_file:
             # Add Excel if exists
-            if excel_file and os.path.exists(excel_file) and os.path.isfile(excel_file):
+            # find_excel_file() only returns existing files
+            if excel_file:
                 try:
-                    # Test that we can actually read the file
-                    with open(excel_file, 'rb') as f:
-                        # Read a small chunk to verify
-                        f.read(1024)
-                    
                     # Add to ZIP with a clean arcname
                     arcname = os.path.basename(excel_file)
                     zip_file.write(excel_file, arcname=arcname)
@@ -86,34 +265,31 @@ def create_download_package():
                 logger.warning(error_msg)
 
             # Add all PDFs if directory exists
-            if os.path.exists(pdf_dir) and os.path.isdir(pdf_dir):
+            if os.path.isdir(pdf_dir):
                 pdf_count = 0
+                next_progress_log = time.monotonic() + PROGRESS_LOG_INTERVAL
                 
                 # Walk through all subdirectories
-                for root, dirs, files in os.walk(pdf_dir):
-                    for filename in files:
-                        if filename.lower().endswith('.pdf'):
-                            pdf_path = os.path.join(root, filename)
-                            try:
-                                # Test that we can actually read the file
-                                with open(pdf_path, 'rb') as f:
-                                    # Read a small chunk to verify
-                                    f.read(1024)
-                                
-                                # Calculate relative path for arcname to maintain directory structure
-                                rel_path = os.path.relpath(pdf_path, media_root)
-                                
-                                # Add to ZIP with proper arcname
-                                zip_file.write(pdf_path, arcname=rel_path)
-                                pdf_count += 1
-                                
-                                if pdf_count % 100 == 0:  # Log progress for large collections
-                                    logger.info(f"Added {pdf_count} PDFs to package so far...")
-                                    
-                            except Exception as e:
-                                error_msg = f"Error reading PDF file {filename}: {str(e)}"
-                                stats['errors'].append(error_msg)
-                                logger.error(error_msg)
+                for pdf_path in iter_pdf_files(pdf_dir):
+                    try:
+                        # Calculate relative path for arcname to maintain directory structure
+                        rel_path = os.path.relpath(pdf_path, media_root)
+                        
+                        # Add to ZIP with proper arcname; PDFs are already
+                        # compressed internally, so they are stored as-is
+                        copy_into_zip(zip_file, pdf_path, rel_path)
+                        pdf_count += 1
+                        
+                        # Log progress for large collections
+                        now = time.monotonic()
+                        if now >= next_progress_log:
+                            logger.info(f"Added {pdf_count} PDFs to package so far...")
+                            next_progress_log = now + PROGRESS_LOG_INTERVAL
+                            
+                    except Exception as e:
+                        error_msg = f"Error reading PDF file {os.path.basename(pdf_path)}: {str(e)}"
+                        stats['errors'].append(error_msg)
+                        logger.error(error_msg)
                 
                 stats['pdf_count'] = pdf_count
                 logger.info(f"Added {pdf_count} PDFs to package")
@@ -143,37 +319,47 @@ def create_download_package():
 def create_package_response(request):
     """
     Creates a ZIP package and returns an appropriate HTTP response.
+    The archive is streamed to the client while it is being built.
     """
-    success, result = create_download_package()
+    # Define paths - ensure they're absolute
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    base_dir = os.path.abspath(settings.BASE_DIR)
     
-    if not success:
-        # Return error message
+    excel_file = find_excel_file(media_root, base_dir)
+    if not excel_file:
+        logger.warning("Excel file not found at any of the expected locations")
+    
+    pdf_dir = os.path.join(media_root, "extracted")
+    pdf_paths = list(iter_pdf_files(pdf_dir)) if os.path.isdir(pdf_dir) else []
+    
+    # Check if we have any content before the response starts
+    if not excel_file and not pdf_paths:
+        logger.error("No files were added to the ZIP package")
         return HttpResponse(
-            result,
-            content_type="text/plain", 
-            status=404 if "not found" in result.lower() else 500
+            "No files found to include in the package. Please ensure the Excel file and PDFs exist.",
+            content_type="text/plain",
+            status=404
         )
     
-    # Unpack the result
-    buffer, zip_filename, stats = result
+    # Create timestamp for unique filename
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    zip_filename = f"extraction_package_{timestamp}.zip"
     
-    # Use FileResponse for better handling of binary data
-    response = FileResponse(
-        buffer,
-        as_attachment=True,
-        filename=zip_filename
-    )
+    logger.info(f"Streaming ZIP package with Excel: {excel_file} and {len(pdf_paths)} PDFs")
     
-    # Set additional headers for better browser compatibility
-    response['Content-Type'] = 'application/zip'
+    # The size isn't known up front, so no Content-Length is sent
+    response = StreamingHttpResponse(
+        stream_package(excel_file, pdf_paths, media_root),
+        content_type='application/zip'
+    )
     response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-    response['Content-Length'] = buffer.getbuffer().nbytes
     
     return response
 
-def create_package_for_large_files():
+def create_package_for_large_files(compression_level=EXCEL_COMPRESSION_LEVEL):
     """
     Creates a ZIP archive for large files using temporary file instead of in-memory buffer.
+    compression_level is the deflate level (0-9) of the Excel file; PDFs are stored.
     Returns a tuple of (success, result) where result is either the file path or an error message.
     """
     # Track success/failure stats
@@ -192,26 +378,10 @@ def create_package_for_large_files():
         media_root = os.path.abspath(settings.MEDIA_ROOT)
         base_dir = os.path.abspath(settings.BASE_DIR)
         
-        # Try multiple potential Excel file paths
-        excel_paths = [
-            os.path.join(media_root, "master_log.xlsx"),
-            os.path.join(base_dir, "logs", "master_log.xlsx"),
-            os.path.join(media_root, "logs", "master_log.xlsx"),
-            os.path.join(media_root, "master.xlsx"),
-            os.path.join(media_root, "all_extracted_data.xlsx")
-        ]
-        
         # Find first existing Excel file
-        excel_file = None
-        for path in excel_paths:
-            if os.path.exists(path) and os.path.isfile(path):
-                excel_file = path
-                logger.info(f"Found Excel file at: {excel_file}")
-                break
-                
+        excel_file = find_excel_file(media_root, base_dir)
         if not excel_file:
             logger.warning(f"Excel file not found in any of the expected locations")
-            excel_file = excel_paths[0]  # Default for error reporting
             
         pdf_dir = os.path.join(media_root, "extracted")
         
@@ -222,10 +392,13 @@ def create_package_for_large_files():
         with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp:
             tmp_path = tmp.name
         
-        # Use the file for the ZIP
-        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        # Use the file for the ZIP. Members are added with known sizes
+        # (ZipInfo.from_file), so Zip64 headers are chosen up front for any
+        # member near the 4 GB limit and never rewritten afterwards
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True, compresslevel=compression_level) as zip_file:
             # Add Excel if exists
-            if excel_file and os.path.exists(excel_file) and os.path.isfile(excel_file):
+            # find_excel_file() only returns existing files
+            if excel_file:
                 try:
                     arcname = os.path.basename(excel_file)
                     zip_file.write(excel_file, arcname=arcname)
@@ -241,29 +414,31 @@ def create_package_for_large_files():
                 logger.warning(error_msg)
                 
             # Add all PDFs if directory exists
-            if os.path.exists(pdf_dir) and os.path.isdir(pdf_dir):
+            if os.path.isdir(pdf_dir):
                 pdf_count = 0
+                next_progress_log = time.monotonic() + PROGRESS_LOG_INTERVAL
                 
                 # Walk through all subdirectories
-                for root, dirs, files in os.walk(pdf_dir):
-                    for filename in files:
-                        if filename.lower().endswith('.pdf'):
-                            pdf_path = os.path.join(root, filename)
-                            try:
-                                # Calculate relative path for arcname to maintain directory structure
-                                rel_path = os.path.relpath(pdf_path, media_root)
-                                
-                                # Add to ZIP with proper arcname
-                                zip_file.write(pdf_path, arcname=rel_path)
-                                pdf_count += 1
-                                
-                                if pdf_count % 100 == 0:  # Log progress for large collections
-                                    logger.info(f"Added {pdf_count} PDFs to package so far...")
-                                    
-                            except Exception as e:
-                                error_msg = f"Error reading PDF file {filename}: {str(e)}"
-                                stats['errors'].append(error_msg)
-                                logger.error(error_msg)
+                for pdf_path in iter_pdf_files(pdf_dir):
+                    try:
+                        # Calculate relative path for arcname to maintain directory structure
+                        rel_path = os.path.relpath(pdf_path, media_root)
+                        
+                        # Add to ZIP with proper arcname; PDFs are already
+                        # compressed internally, so they are stored as-is
+                        copy_into_zip(zip_file, pdf_path, rel_path)
+                        pdf_count += 1
+                        
+                        # Log progress for large collections
+                        now = time.monotonic()
+                        if now >= next_progress_log:
+                            logger.info(f"Added {pdf_count} PDFs to package so far...")
+                            next_progress_log = now + PROGRESS_LOG_INTERVAL
+                            
+                    except Exception as e:
+                        error_msg = f"Error reading PDF file {os.path.basename(pdf_path)}: {str(e)}"
+                        stats['errors'].append(error_msg)
+                        logger.error(error_msg)
                 
                 stats['pdf_count'] = pdf_count
                 logger.info(f"Added {pdf_count} PDFs to package")
@@ -316,307 +491,33 @@ def create_large_package_response(request):
     tmp_path, zip_filename, stats = result
     
     try:
-        # Open the file and create a response
-        with open(tmp_path, 'rb') as f:
-            response = FileResponse(
-                f,
-                as_attachment=True,
-                filename=zip_filename
-            )
-            
-            # Set additional headers for better browser compatibility
-            response['Content-Type'] = 'application/zip'
-            response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-            
-            # Get file size for Content-Length header
-            file_size = os.path.getsize(tmp_path)
-            response['Content-Length'] = file_size
-            
-            # The FileResponse will stream the file, and Django will clean up
-            return response
-    finally:
-        # Ensure we clean up the temp file even if there's an exception
-        try:
-            os.unlink(tmp_path)
-        except:
-            logger.warning(f"Failed to remove temporary file: {tmp_path}")
-    """
-    Creates a ZIP archive containing the master Excel file and all extracted PDFs.
-    Returns a tuple of (success, result) where result is either the file buffer or an error message.
-    """
-    # Track success/failure stats
-    stats = {
-        'excel_included': False,
-        'pdf_count': 0,
-        'errors': []
-    }
-    
-    # Create timestamp for unique filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    zip_filename = f"extraction_package_{timestamp}.zip"
-    
-    try:
-        # Define paths - ensure they're absolute
-        media_root = os.path.abspath(settings.MEDIA_ROOT)
-        excel_file = os.path.join(media_root, "master_log.xlsx")  # Updated to match your project's naming
-        pdf_dir = os.path.join(media_root, "extracted")  # Updated to match your project's structure
-        
-        logger.info(f"Creating ZIP package with Excel from: {excel_file}")
-        logger.info(f"Looking for PDFs in: {pdf_dir}")
-        
-        # Create in-memory buffer
-        buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Add Excel if exists
-            if os.path.exists(excel_file) and os.path.isfile(excel_file):
-                try:
-                    # Test that we can actually read the file
-                    with open(excel_file, 'rb') as f:
-                        # Read a small chunk to verify
-                        f.read(1024)
-                    
-                    # Add to ZIP with a clean arcname
-                    zip_file.write(excel_file, arcname="master_log.xlsx")
-                    stats['excel_included'] = True
-                    logger.info("Excel file added to package successfully")
-                except Exception as e:
-                    error_msg = f"Error reading Excel file: {str(e)}"
-                    stats['errors'].append(error_msg)
-                    logger.error(error_msg)
-            else:
-                error_msg = f"Excel file not found at: {excel_file}"
-                stats['errors'].append(error_msg)
-                logger.warning(error_msg)
-
-            # Add all PDFs if directory exists
-            if os.path.exists(pdf_dir) and os.path.isdir(pdf_dir):
-                pdf_count = 0
-                
-                # Walk through all subdirectories
-                for root, dirs, files in os.walk(pdf_dir):
-                    for filename in files:
-                        if filename.lower().endswith('.pdf'):
-                            pdf_path = os.path.join(root, filename)
-                            try:
-                                # Test that we can actually read the file
-                                with open(pdf_path, 'rb') as f:
-                                    # Read a small chunk to verify
-                                    f.read(1024)
-                                
-                                # Calculate relative path for arcname to maintain directory structure
-                                rel_path = os.path.relpath(pdf_path, media_root)
-                                
-                                # Add to ZIP with proper arcname
-                                zip_file.write(pdf_path, arcname=rel_path)
-                                pdf_count += 1
-                                
-                                if pdf_count % 100 == 0:  # Log progress for large collections
-                                    logger.info(f"Added {pdf_count} PDFs to package so far...")
-                                    
-                            except Exception as e:
-                                error_msg = f"Error reading PDF file {filename}: {str(e)}"
-                                stats['errors'].append(error_msg)
-                                logger.error(error_msg)
-                
-                stats['pdf_count'] = pdf_count
-                logger.info(f"Added {pdf_count} PDFs to package")
-            else:
-                error_msg = f"PDF directory not found at: {pdf_dir}"
-                stats['errors'].append(error_msg)
-                logger.warning(error_msg)
-        
-        # Check if we have any content
-        if not stats['excel_included'] and stats['pdf_count'] == 0:
-            logger.error("No files were added to the ZIP package")
-            return False, "No files found to include in the package. Please ensure the Excel file and PDFs exist."
-        
-        # Prepare response buffer
-        buffer.seek(0)
-        
-        # Log success
-        logger.info(f"ZIP package created successfully with {stats['pdf_count']} PDFs and Excel: {stats['excel_included']}")
-        
-        return True, (buffer, zip_filename, stats)
-        
-    except Exception as e:
-        # Log the full error
-        logger.exception(f"Error creating ZIP package: {str(e)}")
-        return False, f"Error creating package: {str(e)}. Please contact support."
-
-def create_package_response(request):
-    """
-    Creates a ZIP package and returns an appropriate HTTP response.
-    """
-    success, result = create_download_package()
-    
-    if not success:
-        # Return error message
-        return HttpResponse(
-            result,
-            content_type="text/plain", 
-            status=404 if "not found" in result.lower() else 500
+        # Open the file and create a response. The file must stay open:
+        # FileResponse closes it once it has been sent, which also removes
+        # it, and hands it to the server's wsgi.file_wrapper, which can send
+        # it with sendfile(2)
+        f = DeleteOnCloseFile(tmp_path, 'rb')
+        response = FileResponse(
+            f,
+            as_attachment=True,
+            filename=zip_filename
         )
-    
-    # Unpack the result
-    buffer, zip_filename, stats = result
-    
-    # Use FileResponse for better handling of binary data
-    response = FileResponse(
-        buffer,
-        as_attachment=True,
-        filename=zip_filename
-    )
-    
-    # Set additional headers for better browser compatibility
-    response['Content-Type'] = 'application/zip'
-    response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-    response['Content-Length'] = buffer.getbuffer().nbytes
-    
-    return response
-
-def create_package_for_large_files():
-    """
-    Creates a ZIP archive for large files using temporary file instead of in-memory buffer.
-    Returns a tuple of (success, result) where result is either the file path or an error message.
-    """
-    # Track success/failure stats
-    stats = {
-        'excel_included': False,
-        'pdf_count': 0,
-        'errors': []
-    }
-    
-    # Create timestamp for unique filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    zip_filename = f"extraction_package_{timestamp}.zip"
-    
-    try:
-        # Define paths - ensure they're absolute
-        media_root = os.path.abspath(settings.MEDIA_ROOT)
-        excel_file = os.path.join(media_root, "master_log.xlsx")
-        pdf_dir = os.path.join(media_root, "extracted")
-        
-        logger.info(f"Creating large ZIP package with Excel from: {excel_file}")
-        logger.info(f"Looking for PDFs in: {pdf_dir}")
-        
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp:
-            tmp_path = tmp.name
-        
-        # Use the file for the ZIP
-        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add Excel if exists
-            if os.path.exists(excel_file) and os.path.isfile(excel_file):
-                try:
-                    zip_file.write(excel_file, arcname="master_log.xlsx")
-                    stats['excel_included'] = True
-                except Exception as e:
-                    error_msg = f"Error adding Excel file: {str(e)}"
-                    stats['errors'].append(error_msg)
-                    logger.error(error_msg)
-            else:
-                error_msg = f"Excel file not found at: {excel_file}"
-                stats['errors'].append(error_msg)
-                logger.warning(error_msg)
-                
-            # Add all PDFs if directory exists
-            if os.path.exists(pdf_dir) and os.path.isdir(pdf_dir):
-                pdf_count = 0
-                
-                # Walk through all subdirectories
-                for root, dirs, files in os.walk(pdf_dir):
-                    for filename in files:
-                        if filename.lower().endswith('.pdf'):
-                            pdf_path = os.path.join(root, filename)
-                            try:
-                                # Calculate relative path for arcname to maintain directory structure
-                                rel_path = os.path.relpath(pdf_path, media_root)
-                                
-                                # Add to ZIP with proper arcname
-                                zip_file.write(pdf_path, arcname=rel_path)
-                                pdf_count += 1
-                                
-                                if pdf_count % 100 == 0:  # Log progress for large collections
-                                    logger.info(f"Added {pdf_count} PDFs to package so far...")
-                                    
-                            except Exception as e:
-                                error_msg = f"Error reading PDF file {filename}: {str(e)}"
-                                stats['errors'].append(error_msg)
-                                logger.error(error_msg)
-                
-                stats['pdf_count'] = pdf_count
-                logger.info(f"Added {pdf_count} PDFs to package")
-            else:
-                error_msg = f"PDF directory not found at: {pdf_dir}"
-                stats['errors'].append(error_msg)
-                logger.warning(error_msg)
-        
-        # Check if we have any content
-        if not stats['excel_included'] and stats['pdf_count'] == 0:
-            # Clean up the temp file
-            os.unlink(tmp_path)
-            logger.error("No files were added to the ZIP package")
-            return False, "No files found to include in the package. Please ensure the Excel file and PDFs exist."
         
-        # Log success
-        logger.info(f"Large ZIP package created successfully at {tmp_path} with {stats['pdf_count']} PDFs and Excel: {stats['excel_included']}")
+        # Read 1 MB at a time when Django streams the file itself
+        response.block_size = COPY_BUFFER_SIZE
         
-        return True, (tmp_path, zip_filename, stats)
+        # Set additional headers for better browser compatibility
+        response['Content-Type'] = 'application/zip'
+        response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
         
-    except Exception as e:
-        # Log the full error
-        logger.exception(f"Error creating large ZIP package: {str(e)}")
+        # Get file size for Content-Length header
+        file_size = os.fstat(f.fileno()).st_size
+        response['Content-Length'] = file_size
         
-        # Clean up the temp file if it exists
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-                
-        return False, f"Error creating package: {str(e)}. Please contact support."
-
-def create_large_package_response(request):
-    """
-    Creates a large ZIP package using a temp file and returns an appropriate HTTP response.
-    This is more suitable for large files than using an in-memory buffer.
-    """
-    success, result = create_package_for_large_files()
-    
-    if not success:
-        # Return error message
-        return HttpResponse(
-            result,
-            content_type="text/plain", 
-            status=404 if "not found" in result.lower() else 500
-        )
-    
-    # Unpack the result
-    tmp_path, zip_filename, stats = result
-    
-    try:
-        # Open the file and create a response
-        with open(tmp_path, 'rb') as f:
-            response = FileResponse(
-                f,
-                as_attachment=True,
-                filename=zip_filename
-            )
-            
-            # Set additional headers for better browser compatibility
-            response['Content-Type'] = 'application/zip'
-            response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-            
-            # Get file size for Content-Length header
-            file_size = os.path.getsize(tmp_path)
-            response['Content-Length'] = file_size
-            
-            # The FileResponse will stream the file, and Django will clean up
-            return response
-    finally:
-        # Ensure we clean up the temp file even if there's an exception
+        return response
+    except Exception:
+        # No response will close the file, so remove it here
         try:
             os.unlink(tmp_path)
-        except:
+        except OSError:
             logger.warning(f"Failed to remove temporary file: {tmp_path}")
+        raise
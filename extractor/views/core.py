@@ -2,8 +2,9 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, FileResponse
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import content_disposition_header
 from django.conf import settings
 from django.db.models import Count
 from celery.result import AsyncResult
@@ -13,38 +14,60 @@ import io
 import json
 import logging
 import tempfile
-import shutil
-import zipfile
+from collections import defaultdict
+from contextlib import ExitStack
 from datetime import datetime
+from openpyxl import Workbook
 from ..models import ExtractedData, Vendor, UploadedPDF
 from ..utils.extractor import extract_pdf_fields
 from ..utils.config_loader import load_vendor_config
-from ..utils.excel_helper import create_template_if_not_exists, apply_formatting, write_dataframe_to_sheet
+from ..utils.excel_helper import write_frames_to_xlsx, write_rows_to_sheet
+from ..utils.file_utils import build_prefix_index, fast_copy_file, find_by_prefix
+from ..utils.master_excel import FIELD_KEYS
+from ..utils.zip_utils import COPY_BUFFER_SIZE, ClosingStream, stream_directory
+from ..utils.json_response import OrjsonResponse
 from ..tasks import process_pdf_file
 
 logger = logging.getLogger('extractor')
 
 def dashboard(request):
     """Dashboard view showing summary of uploaded PDFs and extraction status"""
-    recent_pdfs = UploadedPDF.objects.all().order_by('-uploaded_at')[:10]
+    recent_pdfs = UploadedPDF.objects.select_related('vendor').order_by('-uploaded_at')[:10]
     vendors = Vendor.objects.annotate(pdf_count=Count('pdfs'))
     
+    # Extracted fields of all recent PDFs in one query, grouped by PDF, newest first
+    pdf_fields = defaultdict(list)
+    extracted_rows = (
+        ExtractedData.objects
+        .filter(pdf_id__in=[pdf.id for pdf in recent_pdfs])
+        .order_by('-created_at')
+        .values_list('pdf_id', 'id', 'field_key', 'field_value')
+    )
+    for pdf_id, extracted_id, field_key, field_value in extracted_rows:
+        pdf_fields[pdf_id].append((extracted_id, field_key, field_value))
+    
+    # Newest extracted field of each PDF
+    last_extracted = ExtractedData.objects.in_bulk([fields[0][0] for fields in pdf_fields.values()])
+    
     # Get extraction data for display
     data = []
     for pdf in recent_pdfs:
-        extracted_data = ExtractedData.objects.filter(pdf=pdf)
+        fields = pdf_fields.get(pdf.id, [])
+        
+        # First value of each key field
+        key_values = {}
+        for _, field_key, field_value in fields:
+            key_values.setdefault(field_key, field_value)
+        
         data.append({
             'pdf': pdf,
             'pdf_id': pdf.id,  # Include PDF ID explicitly
-            'extracted_count': extracted_data.count(),
-            'last_extracted': extracted_data.order_by('-created_at').first(),
-            'key_fields': {
-                field: next((item.field_value for item in extracted_data if item.field_key == field), '')
-                for field in ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']
-            },
-            'PLATE_NO': next((item.field_value for item in extracted_data if item.field_key == 'PLATE_NO'), ''),
-            'HEAT_NO': next((item.field_value for item in extracted_data if item.field_key == 'HEAT_NO'), ''),
-            'TEST_CERT_NO': next((item.field_value for item in extracted_data if item.field_key == 'TEST_CERT_NO'), ''),
+            'extracted_count': len(fields),
+            'last_extracted': last_extracted.get(fields[0][0]) if fields else None,
+            'key_fields': {field: key_values.get(field, '') for field in FIELD_KEYS},
+            'PLATE_NO': key_values.get('PLATE_NO', ''),
+            'HEAT_NO': key_values.get('HEAT_NO', ''),
+            'TEST_CERT_NO': key_values.get('TEST_CERT_NO', ''),
             'Vendor': pdf.vendor.name if hasattr(pdf, 'vendor') and pdf.vendor else 'Unknown',
             'Source PDF': pdf.file.name,
             'Created': pdf.uploaded_at.strftime("%Y-%m-%d %H:%M:%S") if hasattr(pdf, 'uploaded_at') else 'Unknown',
@@ -55,8 +78,12 @@ def dashboard(request):
     
     # Calculate totals for the dashboard
     total_pdfs = UploadedPDF.objects.count()
-    total_extracted = ExtractedData.objects.values('pdf').distinct().count()
-    total_rows = ExtractedData.objects.count()
+    extraction_totals = ExtractedData.objects.aggregate(
+        total_extracted=Count('pdf', distinct=True),
+        total_rows=Count('id'),
+    )
+    total_extracted = extraction_totals['total_extracted']
+    total_rows = extraction_totals['total_rows']
     
     # Add debug info for static files if in debug mode
     static_debug = None
@@ -89,186 +116,101 @@ def upload_pdf(request):
     return render(request, 'extractor/upload.html', {'vendors': vendors})
 
 def create_extraction_excel(excel_path, pdf_obj, extracted_data):
-    """Creates a detailed Excel file with multiple sheets for extracted data"""
-    import pandas as pd
-    import openpyxl
-    from openpyxl.utils import get_column_letter
+    """
+    Creates a detailed Excel file with multiple sheets for extracted data.
+
+    extracted_data is an ExtractedData QuerySet; it is read with a single
+    query. excel_path may be a file path or a file-like object (BytesIO);
+    file-like objects are rewound so they can be read straight away.
     
+    Returns the number of extracted fields written, so callers can tell an
+    empty extraction apart without querying extracted_data again.
+    """
     pdf_filename = os.path.basename(pdf_obj.file.name)
     
-    # Ensure we have a template
-    template_path = create_template_if_not_exists()
+    # Everything the sheets need is collected in a single pass over the data,
+    # read as plain tuples rather than model instances. The rows are streamed
+    # in chunks, so the QuerySet does not cache a second copy of them.
+    total_fields = 0
+    main_rows = []
+    key_matches = {field: [] for field in FIELD_KEYS}
+    page_fields = {}  # page -> [fields found, key fields found]
+    page_paths = {}  # page -> path of its extracted PDF, formatted once per page
     
-    # For file-like objects (BytesIO), we need to create a copy of the template
-    if hasattr(excel_path, 'write'):
-        # This is a file-like object (BytesIO)
-        with open(template_path, 'rb') as template_file:
-            template_content = template_file.read()
-            # We need to write the template content to the BytesIO object
-            excel_path.write(template_content)
-            excel_path.seek(0)  # Reset position for reading
-            
-        # Load the workbook from the BytesIO object
-        workbook = openpyxl.load_workbook(excel_path)
-        
-        # Prepare DataFrames
-        summary_data = pd.DataFrame({
-            'Information': [
-                'File Name', 'Vendor', 'Upload Date', 'Total Fields', 
-                'Total Pages', 'Status'
-            ],
-            'Value': [
-                pdf_filename,
-                pdf_obj.vendor.name,
-                pdf_obj.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                extracted_data.count(),
-                len(set(item.page_number for item in extracted_data if item.page_number)),
-                'Extraction Complete'
-            ]
-        })
-        
-        main_data = pd.DataFrame([{
-            'Field Type': item.field_key,
-            'Extracted Value': item.field_value,
-            'Page Number': item.page_number,
-            'PDF Location': f'extracted_pdfs/page_{item.page_number}.pdf' if item.page_number else 'N/A',
-            'Extracted At': item.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        } for item in extracted_data]) if extracted_data.exists() else pd.DataFrame()
+    rows = (
+        extracted_data
+        .values_list('field_key', 'field_value', 'page_number', 'created_at')
+        .iterator(chunk_size=2000)
+    )
+    for field_key, field_value, page, created_at in rows:
+        total_fields += 1
+        
+        page_path = page_paths.get(page)
+        if page_path is None:
+            page_path = page_paths[page] = f'extracted_pdfs/page_{page}.pdf'
+        
+        # Main extraction sheet
+        main_rows.append((
+            field_key,
+            field_value,
+            page,
+            page_path if page else 'N/A',
+            created_at.strftime("%Y-%m-%d %H:%M:%S")
+        ))
         
         # Key Fields sheet
-        key_fields = ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']
-        key_data = []
-        
-        for field in key_fields:
-            matches = [item for item in extracted_data if item.field_key == field]
-            for match in matches:
-                key_data.append({
-                    'Field': field,
-                    'Value': match.field_value,
-                    'Page': match.page_number,
-                    'PDF File': f'extracted_pdfs/page_{match.page_number}.pdf',
-                    'Status': 'Verified' if match.field_value else 'Not Found'
-                })
-        
-        key_data_df = pd.DataFrame(key_data) if key_data else pd.DataFrame()
+        matches = key_matches.get(field_key)
+        if matches is not None:
+            matches.append((
+                field_key,
+                field_value,
+                page,
+                page_path,
+                'Verified' if field_value else 'Not Found'
+            ))
         
         # Page Summary sheet
-        page_data = []
-        for page in sorted(set(item.page_number for item in extracted_data if item.page_number)):
-            page_fields = [item for item in extracted_data if item.page_number == page]
-            key_fields_found = [
-                f"{item.field_key}: {item.field_value}"
-                for item in page_fields
-                if item.field_key in key_fields and item.field_value
-            ]
-            
-            page_data.append({
-                'Page Number': page,
-                'Fields Found': len(page_fields),
-                'PDF File': f'extracted_pdfs/page_{page}.pdf',
-                'Key Fields Found': ', '.join(key_fields_found) if key_fields_found else 'None'
-            })
-        
-        page_data_df = pd.DataFrame(page_data) if page_data else pd.DataFrame()
-        
-        # Write data to sheets
-        write_dataframe_to_sheet(workbook, 'Summary', summary_data)
-        
-        if not main_data.empty:
-            write_dataframe_to_sheet(workbook, 'Extracted Data', main_data)
-        
-        if not key_data_df.empty:
-            write_dataframe_to_sheet(workbook, 'Key Fields', key_data_df)
-        
-        if not page_data_df.empty:
-            write_dataframe_to_sheet(workbook, 'Page Summary', page_data_df)
-        
-        # Apply consistent formatting
-        apply_formatting(workbook)
-        
-        # Clear the BytesIO object and save the workbook to it
-        excel_path.seek(0)
-        excel_path.truncate(0)
-        workbook.save(excel_path)
+        if page:
+            page_entry = page_fields.get(page)
+            if page_entry is None:
+                page_entry = page_fields[page] = [0, []]
+            page_entry[0] += 1
+            if matches is not None and field_value:
+                page_entry[1].append(f"{field_key}: {field_value}")
+    
+    # Summary sheet
+    summary_rows = [
+        ('File Name', pdf_filename),
+        ('Vendor', pdf_obj.vendor.name),
+        ('Upload Date', pdf_obj.uploaded_at.strftime("%Y-%m-%d %H:%M:%S")),
+        ('Total Fields', total_fields),
+        ('Total Pages', len(page_fields)),
+        ('Status', 'Extraction Complete'),
+    ]
+    
+    # Key fields are listed grouped by field
+    key_rows = [row for field in FIELD_KEYS for row in key_matches[field]]
+    
+    page_rows = [(
+        page,
+        fields_found,
+        page_paths[page],
+        ', '.join(key_fields_found) if key_fields_found else 'None'
+    ) for page, (fields_found, key_fields_found) in sorted(page_fields.items())]
+    
+    # Rows are written straight to a write-only workbook, which streams
+    # them out on save instead of keeping styled cells in memory
+    workbook = Workbook(write_only=True)
+    write_rows_to_sheet(workbook, 'Summary', ('Information', 'Value'), summary_rows)
+    write_rows_to_sheet(workbook, 'Extracted Data', ('Field Type', 'Extracted Value', 'Page Number', 'PDF Location', 'Extracted At'), main_rows)
+    write_rows_to_sheet(workbook, 'Key Fields', ('Field', 'Value', 'Page', 'PDF File', 'Status'), key_rows)
+    write_rows_to_sheet(workbook, 'Page Summary', ('Page Number', 'Fields Found', 'PDF File', 'Key Fields Found'), page_rows)
+    workbook.save(excel_path)
+    
+    if hasattr(excel_path, 'seek'):
         excel_path.seek(0)  # Reset position for reading
-        
-    else:
-        # This is a file path
-        import shutil
-        # Copy the template to the destination
-        shutil.copy2(template_path, excel_path)
-        
-        # Then use pandas to write to it
-        with pd.ExcelWriter(excel_path, engine='openpyxl', mode='a') as writer:
-            # Summary sheet
-            summary_data = {
-                'Information': [
-                    'File Name', 'Vendor', 'Upload Date', 'Total Fields', 
-                    'Total Pages', 'Status'
-                ],
-                'Value': [
-                    pdf_filename,
-                    pdf_obj.vendor.name,
-                    pdf_obj.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    extracted_data.count(),
-                    len(set(item.page_number for item in extracted_data if item.page_number)),
-                    'Extraction Complete'
-                ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Main extraction sheet
-            main_data = [{
-                'Field Type': item.field_key,
-                'Extracted Value': item.field_value,
-                'Page Number': item.page_number,
-                'PDF Location': f'extracted_pdfs/page_{item.page_number}.pdf' if item.page_number else 'N/A',
-                'Extracted At': item.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            } for item in extracted_data]
-            
-            if main_data:
-                pd.DataFrame(main_data).to_excel(writer, sheet_name='Extracted Data', index=False)
-            
-            # Key Fields sheet
-            key_fields = ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']
-            key_data = []
-            
-            for field in key_fields:
-                matches = [item for item in extracted_data if item.field_key == field]
-                for match in matches:
-                    key_data.append({
-                        'Field': field,
-                        'Value': match.field_value,
-                        'Page': match.page_number,
-                        'PDF File': f'extracted_pdfs/page_{match.page_number}.pdf',
-                        'Status': 'Verified' if match.field_value else 'Not Found'
-                    })
-            
-            if key_data:
-                pd.DataFrame(key_data).to_excel(writer, sheet_name='Key Fields', index=False)
-            
-            # Page Summary sheet
-            page_data = []
-            for page in sorted(set(item.page_number for item in extracted_data if item.page_number)):
-                page_fields = [item for item in extracted_data if item.page_number == page]
-                key_fields_found = [
-                    f"{item.field_key}: {item.field_value}"
-                    for item in page_fields
-                    if item.field_key in key_fields and item.field_value
-                ]
-                
-                page_data.append({
-                    'Page Number': page,
-                    'Fields Found': len(page_fields),
-                    'PDF File': f'extracted_pdfs/page_{page}.pdf',
-                    'Key Fields Found': ', '.join(key_fields_found) if key_fields_found else 'None'
-                })
-            
-            if page_data:
-                pd.DataFrame(page_data).to_excel(writer, sheet_name='Page Summary', index=False)
-            
-            # Load the workbook to apply formatting
-            writer.book = apply_formatting(writer.book)
+    
+    return total_fields
 
 def download_excel(request):
     """Download extraction results as Excel file"""
@@ -283,11 +225,19 @@ def download_excel(request):
         
         if os.path.exists(master_path):
             try:
+                if settings.USE_X_ACCEL_REDIRECT:
+                    # nginx sends the file itself, freeing this worker straight away
+                    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+                    response['X-Accel-Redirect'] = f"{settings.X_ACCEL_REDIRECT_PREFIX}backups/master.xlsx"
+                    response['Content-Disposition'] = content_disposition_header(True, "Master_Extracted_Data_ReadOnly.xlsx")
+                    return response
+                
                 response = FileResponse(
                     open(master_path, "rb"),
                     as_attachment=True,
                     filename="Master_Extracted_Data_ReadOnly.xlsx"
                 )
+                response.block_size = COPY_BUFFER_SIZE
                 response['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
                 return response
             except Exception as e:
@@ -301,13 +251,11 @@ def download_excel(request):
         pdf = UploadedPDF.objects.get(id=pdf_id)
         extracted_data = ExtractedData.objects.filter(pdf=pdf).order_by('field_key')
         
-        if not extracted_data.exists():
+        # Create Excel file; nothing written means nothing was extracted
+        excel_buffer = io.BytesIO()
+        if not create_extraction_excel(excel_buffer, pdf, extracted_data):
             messages.warning(request, "No extracted data found for this PDF")
             return redirect(referer)
-            
-        # Create Excel file
-        excel_buffer = io.BytesIO()
-        create_extraction_excel(excel_buffer, pdf, extracted_data)
         
         # Prepare response
         excel_buffer.seek(0)
@@ -326,16 +274,6 @@ def download_excel(request):
         messages.error(request, "Could not create Excel file")
         return redirect(referer)
 
-def task_status(request, task_id):
-    """Get the status of an async task"""
-    task = AsyncResult(task_id)
-    data = {
-        'state': task.state,
-    }
-    if task.state == 'SUCCESS':
-        data['result'] = task.get()
-    return JsonResponse(data)
-
 def regenerate_excel(request):
     """Regenerates the Excel file for all extracted data."""
     # Get the referring page to redirect back if there's an error
@@ -348,13 +286,11 @@ def regenerate_excel(request):
             pdf = UploadedPDF.objects.get(id=pdf_id)
             extracted_data = ExtractedData.objects.filter(pdf=pdf).order_by('field_key')
             
-            if not extracted_data.exists():
+            # Create Excel file; nothing written means nothing was extracted
+            excel_buffer = io.BytesIO()
+            if not create_extraction_excel(excel_buffer, pdf, extracted_data):
                 messages.warning(request, "No extracted data found for this PDF")
                 return redirect(referer)
-                
-            # Create Excel file
-            excel_buffer = io.BytesIO()
-            create_extraction_excel(excel_buffer, pdf, extracted_data)
             
             # Prepare response
             excel_buffer.seek(0)
@@ -393,7 +329,8 @@ def download_pdfs_with_excel(request):
     referer = request.META.get('HTTP_REFERER', '/dashboard/')
     
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with ExitStack() as cleanup:
+            temp_dir = cleanup.enter_context(tempfile.TemporaryDirectory())
             if pdf_id or source_pdf:
                 try:
                     # Get the PDF file
@@ -423,7 +360,7 @@ def download_pdfs_with_excel(request):
                     pdf_filename = os.path.basename(pdf.file.name)
                     orig_pdf_path = os.path.join(orig_dir, pdf_filename)
                     if os.path.exists(pdf.file.path):
-                        shutil.copy2(pdf.file.path, orig_pdf_path)
+                        fast_copy_file(pdf.file.path, orig_pdf_path, keep_times=True)
                     
                     # Copy extracted PDFs
                     base_extracted_dir = os.path.join(settings.MEDIA_ROOT, 'extracted')
@@ -436,7 +373,7 @@ def download_pdfs_with_excel(request):
                                 if file.startswith(pdf_name_without_ext) and file.endswith('.pdf'):
                                     src_path = os.path.join(root, file)
                                     dest_path = os.path.join(extracted_dir, file)
-                                    shutil.copy2(src_path, dest_path)
+                                    fast_copy_file(src_path, dest_path, keep_times=True)
                                     extracted_files.append(file)
                     
                     # Create Excel file
@@ -445,18 +382,9 @@ def download_pdfs_with_excel(request):
                     
                     # Create ZIP file
                     zip_filename = f"{pdf_name_without_ext}_extraction_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-                    zip_buffer = io.BytesIO()
                     
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                        # Add all files maintaining directory structure
-                        for root, _, files in os.walk(pdf_dir):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.relpath(file_path, pdf_dir)
-                                zipf.write(file_path, arcname=arcname)
-                        
-                        # Add README
-                        readme_content = f"""Extraction Summary
+                    # README added after the package files
+                    readme_content = f"""Extraction Summary
 
 PDF: {pdf_filename}
 Vendor: {pdf.vendor.name}
@@ -475,27 +403,52 @@ Directory Structure:
 Extracted Files:
 {chr(10).join(f"- {file}" for file in extracted_files)}
 """
-                        zipf.writestr("README.txt", readme_content)
+                    zip_root = pdf_dir
                     
                 except UploadedPDF.DoesNotExist:
                     messages.error(request, "PDF file not found")
                     return redirect("dashboard")
                     
             else:
-                # Get all PDFs that have extracted data
-                pdfs_with_data = UploadedPDF.objects.filter(extracted_data__isnull=False).distinct()
+                # Get all PDFs that have extracted data, with their vendors, in one query
+                pdfs_with_data = list(
+                    UploadedPDF.objects.filter(extracted_data__isnull=False)
+                    .select_related('vendor')
+                    .distinct()
+                )
                 
-                if not pdfs_with_data.exists():
+                if not pdfs_with_data:
                     messages.warning(request, "No PDFs with extracted data found")
                     return redirect("dashboard")
                 
+                # Count the fields of every PDF and keep the first value of each
+                # key field, in one pass over a single query instead of a query
+                # and a count per PDF. Every row belongs to one of the PDFs above.
+                fields_found = defaultdict(int)
+                key_field_values = defaultdict(dict)
+                extracted_rows = (
+                    ExtractedData.objects
+                    .order_by('field_key', 'id')
+                    .values_list('pdf_id', 'field_key', 'field_value')
+                )
+                for pdf_id, field_key, field_value in extracted_rows.iterator(chunk_size=5000):
+                    fields_found[pdf_id] += 1
+                    if field_key in FIELD_KEYS:
+                        key_field_values[pdf_id].setdefault(field_key, field_value)
+                
                 # Set up base directory for package
                 package_dir = os.path.join(temp_dir, 'package')
                 os.makedirs(package_dir, exist_ok=True)
                 
+                # List the extracted PDFs once, instead of walking the folder for every PDF
+                extracted_index = build_prefix_index(os.path.join(settings.MEDIA_ROOT, 'extracted'))
+                
                 # Process PDFs and create summary
                 all_data = []
                 for pdf in pdfs_with_data:
+                    pdf_filename = os.path.basename(pdf.file.name)
+                    pdf_name_without_ext = os.path.splitext(pdf_filename)[0]
+                    
                     # Create individual PDF directory
                     pdf_dir = os.path.join(package_dir, pdf_name_without_ext)
                     orig_dir = os.path.join(pdf_dir, 'original')
@@ -505,57 +458,39 @@ Extracted Files:
                     
                     # Copy original PDF
                     if os.path.exists(pdf.file.path):
-                        shutil.copy2(pdf.file.path, os.path.join(orig_dir, pdf_filename))
+                        fast_copy_file(pdf.file.path, os.path.join(orig_dir, pdf_filename), keep_times=True)
                     
                     # Find and copy extracted PDFs
-                    base_extracted_dir = os.path.join(settings.MEDIA_ROOT, 'extracted')
-                    if os.path.exists(base_extracted_dir):
-                        extracted_count = 0
-                        for root, _, files in os.walk(base_extracted_dir):
-                            for file in files:
-                                if file.startswith(pdf_name_without_ext) and file.endswith('.pdf'):
-                                    src_path = os.path.join(root, file)
-                                    dest_path = os.path.join(extracted_dir, file)
-                                    shutil.copy2(src_path, dest_path)
-                                    extracted_count += 1
+                    extracted_count = 0
+                    for file, src_path in find_by_prefix(extracted_index, pdf_name_without_ext):
+                        dest_path = os.path.join(extracted_dir, file)
+                        fast_copy_file(src_path, dest_path, keep_times=True)
+                        extracted_count += 1
                     
                     # Add to summary data
-                    extracted_data = ExtractedData.objects.filter(pdf=pdf).order_by('field_key')
-                    key_data = {
-                        field: next((item.field_value for item in extracted_data if item.field_key == field), '')
-                        for field in ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']
-                    }
+                    key_data = key_field_values[pdf.id]
                     
                     all_data.append({
-                        'PDF File': os.path.basename(pdf.file.name),
+                        'PDF File': pdf_filename,
                         'Vendor': pdf.vendor.name,
-                        'PLATE_NO': key_data['PLATE_NO'],
-                        'HEAT_NO': key_data['HEAT_NO'],
-                        'TEST_CERT_NO': key_data['TEST_CERT_NO'],
+                        'PLATE_NO': key_data.get('PLATE_NO', ''),
+                        'HEAT_NO': key_data.get('HEAT_NO', ''),
+                        'TEST_CERT_NO': key_data.get('TEST_CERT_NO', ''),
                         'Uploaded At': pdf.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                        'Fields Found': extracted_data.count(),
+                        'Fields Found': fields_found[pdf.id],
                         'Extracted Pages': extracted_count
                     })
                 
                 # Create Excel summary
                 excel_path = os.path.join(package_dir, 'extraction_summary.xlsx')
                 df = pd.DataFrame(all_data)
-                df.to_excel(excel_path, index=False)
+                write_frames_to_xlsx(excel_path, {'Sheet1': df})
                 
                 # Create ZIP file
                 zip_filename = f"all_extractions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-                zip_buffer = io.BytesIO()
                 
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # Add all files maintaining directory structure
-                    for root, _, files in os.walk(package_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, package_dir)
-                            zipf.write(file_path, arcname=arcname)
-                    
-                    # Add README
-                    readme_content = """Extraction Summary
+                # README added after the package files
+                readme_content = """Extraction Summary
 
 This archive contains:
 1. Original PDFs and their extracted pages
@@ -569,23 +504,24 @@ Directory Structure:
 
 Summary:
 """
-                    for item in all_data:
-                        readme_content += f"\nPDF: {item['PDF File']}\n"
-                        readme_content += f"- Vendor: {item['Vendor']}\n"
-                        readme_content += f"- Uploaded: {item['Uploaded At']}\n"
-                        readme_content += f"- Fields Found: {item['Fields Found']}\n"
-                        readme_content += f"- Extracted Pages: {item['Extracted Pages']}\n"
-                    
-                    readme_content += f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                    zipf.writestr("README.txt", readme_content)
+                for item in all_data:
+                    readme_content += f"\nPDF: {item['PDF File']}\n"
+                    readme_content += f"- Vendor: {item['Vendor']}\n"
+                    readme_content += f"- Uploaded: {item['Uploaded At']}\n"
+                    readme_content += f"- Fields Found: {item['Fields Found']}\n"
+                    readme_content += f"- Extracted Pages: {item['Extracted Pages']}\n"
+                
+                readme_content += f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                zip_root = package_dir
             
-            # Reset buffer position and return response
-            zip_buffer.seek(0)
-            response = FileResponse(
-                zip_buffer,
-                as_attachment=True,
-                filename=zip_filename
+            # Stream the archive while it is built; the temporary directory is
+            # removed when the response is closed, even if it was never streamed
+            zip_stream = ClosingStream(
+                stream_directory(zip_root, [("README.txt", readme_content)]),
+                cleanup.pop_all().close
             )
+            response = StreamingHttpResponse(zip_stream, content_type='application/zip')
+            response['Content-Disposition'] = content_disposition_header(True, zip_filename)
             return response
             
     except Exception as e:
@@ -594,9 +530,7 @@ Summary:
         return redirect(referer)
 
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from ..models import UploadedPDF, Vendor
 from ..tasks import process_pdf_file
 import hashlib
@@ -605,23 +539,29 @@ import hashlib
 def process_pdf(request):
     if request.method == 'POST':
         vendor_id = request.POST.get('vendor')
-        vendor = Vendor.objects.filter(id=vendor_id).first()
         pdf_file = request.FILES.get('pdf')
         
+        # Validate the vendor before the upload is hashed or saved; ids that
+        # cannot exist are rejected without a query
+        vendor = Vendor.objects.filter(id=vendor_id).first() if vendor_id and vendor_id.isdigit() else None
+        
         if not vendor or not pdf_file:
             messages.error(request, "Missing vendor or PDF file.")
             logger.error("Missing vendor or PDF file in request")
-            return JsonResponse({'error': 'Missing vendor or PDF file.', 'redirect': '/dashboard/'}, status=400)
+            return OrjsonResponse({'error': 'Missing vendor or PDF file.', 'redirect': '/dashboard/'}, status=400)
 
         # Verify file is a PDF
         if not pdf_file.name.lower().endswith('.pdf'):
             messages.error(request, "Uploaded file must be a PDF")
             logger.error(f"File {pdf_file.name} is not a PDF")
-            return JsonResponse({'error': 'Uploaded file must be a PDF', 'redirect': '/dashboard/'}, status=400)
+            return OrjsonResponse({'error': 'Uploaded file must be a PDF', 'redirect': '/dashboard/'}, status=400)
 
-        # Check for duplicate files - read PDF content and calculate hash
-        file_hash = hashlib.sha256(pdf_file.read()).hexdigest()
-        pdf_file.seek(0)  # Reset file pointer after reading
+        # Check for duplicate files - hash the PDF chunk by chunk, so large
+        # uploads are never read into memory as a whole
+        hasher = hashlib.sha256()
+        for chunk in pdf_file.chunks():
+            hasher.update(chunk)
+        file_hash = hasher.hexdigest()
         
         # Debug print for duplicate check
         logger.info(f"[DEBUG] Checking for duplicate file with hash: {file_hash}")
@@ -636,16 +576,16 @@ def process_pdf(request):
             if existing_pdf.vendor.id != vendor.id:
                 messages.error(request, f"Choose correct vendor for the PDF file. This PDF was previously uploaded for vendor '{existing_pdf.vendor.name}'")
                 logger.warning(f"Vendor mismatch for PDF {pdf_file.name}. Expected: {existing_pdf.vendor.name}, Got: {vendor.name}")
-                return JsonResponse({'error': 'Vendor mismatch', 'redirect': '/upload/'}, status=200)
+                return OrjsonResponse({'error': 'Vendor mismatch', 'redirect': '/upload/'}, status=200)
             
             # If duplicate with same vendor, show warning
             messages.warning(request, f"Duplicate file detected. This PDF was already processed on {existing_pdf.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')}")
             logger.warning(f"Duplicate PDF detected: {pdf_file.name}")
-            return JsonResponse({'redirect': '/dashboard/'}, status=200)
+            return OrjsonResponse({'redirect': '/dashboard/'}, status=200)
         
-        # Save PDF file
-        file_path = default_storage.save(f"uploads/{pdf_file.name}", ContentFile(pdf_file.read()))
-        pdf_file.seek(0)
+        # Save PDF file; the storage moves uploads already spooled to disk
+        # and copies in-memory ones chunk by chunk
+        file_path = default_storage.save(f"uploads/{pdf_file.name}", pdf_file)
         
         # Create UploadedPDF entry with PENDING status to avoid NOT NULL constraint
         uploaded_pdf = UploadedPDF.objects.create(
@@ -668,7 +608,7 @@ def process_pdf(request):
             uploaded_pdf.save()
             messages.error(request, f"Error loading vendor config for {vendor.name}")
             logger.error(f"Config for vendor '{vendor.name}' not found")
-            return JsonResponse({'error': 'Error loading vendor config', 'redirect': '/dashboard/'}, status=500)
+            return OrjsonResponse({'error': 'Error loading vendor config', 'redirect': '/dashboard/'}, status=500)
         
         # Trigger extraction via Celery
         task = process_pdf_file.delay(uploaded_pdf.id, vendor_config)
@@ -680,27 +620,36 @@ def process_pdf(request):
         messages.success(request, "Extraction started")
         
         # Return success response with task ID
-        return JsonResponse({
+        return OrjsonResponse({
             'status': 'success', 
             'pdf_id': uploaded_pdf.id, 
             'task_id': task.id,
             'redirect': '/dashboard/'
         })
-    return JsonResponse({'error': 'Invalid request'}, status=400)
+    return OrjsonResponse({'error': 'Invalid request'}, status=400)
 
 
 def task_progress(request, task_id):
-    """Get progress percentage for a Celery task"""
-    from celery.result import AsyncResult
+    """
+    Get progress percentage and status for a Celery task.
     
+    Also served as task_status, so pollers only need one endpoint. The task
+    meta is read from the result backend once per call rather than once per
+    state/info access.
+    """
     res = AsyncResult(task_id)
+    task_meta = res.backend.get_task_meta(task_id)
+    state = task_meta['status']
+    info = task_meta['result']
+    
+    data = {"state": state}
     
     # Calculate progress percentage based on task state
-    if res.state == "PENDING":
+    if state == "PENDING":
         progress = 0
         message = "Task is queued..."
-    elif res.state == "PROGRESS":
-        meta = res.info or {}
+    elif state == "PROGRESS":
+        meta = info or {}
         phase = meta.get("phase", "")
         current = meta.get("current", 0)
         total = meta.get("total", 4)
@@ -715,10 +664,11 @@ def task_progress(request, task_id):
         
         progress = phase_progress.get(phase, (current / total) * 100)
         message = f"Processing: {phase.title()}..."
+        data.update(phase=phase, current=current, total=total)
         
-    elif res.state == "SUCCESS":
+    elif state == "SUCCESS":
         progress = 100
-        result_data = res.result or {}
+        result_data = info or {}
         status = result_data.get('status', 'completed')
         extracted = result_data.get('extracted', 0)
         
@@ -730,16 +680,18 @@ def task_progress(request, task_id):
             message = "❌ Extraction failed - OCR fallback unsuccessful."
         else:
             message = "Processing completed."
+        data["result"] = info
             
-    elif res.state == "FAILURE":
+    elif state == "FAILURE":
         progress = 100
         message = "❌ Extraction failed due to an error."
     else:
         progress = 0
-        message = f"Task state: {res.state}"
+        message = f"Task state: {state}"
     
-    return JsonResponse({
-        "progress": int(progress),
-        "message": message,
-        "state": res.state
-    })
+    data.update(progress=int(progress), message=message)
+    return OrjsonResponse(data)
+
+# task_progress returns everything task_status used to (state, and result on
+# success) plus the phase, current and total the dashboard's poller reads
+task_status = task_progress
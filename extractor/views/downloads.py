@@ -3,23 +3,32 @@ import os
 import io
 import logging
 import tempfile
-import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
 
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.conf import settings
-from django.http import FileResponse, HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.db.models import Q
 
+import numpy as np
 import pandas as pd
 
 from ..models import ExtractedData, UploadedPDF
+from ..utils.excel_helper import write_frames_to_xlsx
+from ..utils.file_utils import fast_copy_file
+from ..utils.master_excel import FIELD_KEYS
+from ..utils.zip_utils import PACKAGE_COMPRESSION_LEVEL, STORED_EXTENSIONS, ClosingStream, copy_into_zip, stream_directory
 
 # Configure logging
 logger = logging.getLogger('extractor')
 
+# Threads copying PDFs into the package of download_all_pdfs_package
+PDF_COPY_WORKERS = 16
+
 def download_all_pdfs_package(request):
     """
     Creates a comprehensive ZIP archive containing:
@@ -43,18 +52,25 @@ def download_all_pdfs_package(request):
     try:
         # Step 1: Create temporary directory for working with files
         logger.info("Creating temporary directory")
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with ExitStack() as cleanup:
+            temp_dir = cleanup.enter_context(tempfile.TemporaryDirectory())
+            
             # Step 2: Query database for PDFs with extracted data
             logger.info("Querying database for PDFs with extracted data")
-            pdfs_with_data = UploadedPDF.objects.filter(
-                extracted_data__isnull=False,
-                status='COMPLETED'
-            ).distinct()
+            # Vendors are joined in, instead of querying them for each PDF
+            pdfs_with_data = list(
+                UploadedPDF.objects.filter(
+                    extracted_data__isnull=False,
+                    status='COMPLETED'
+                )
+                .select_related('vendor')
+                .distinct()
+            )
             
-            pdf_count = pdfs_with_data.count()
+            pdf_count = len(pdfs_with_data)
             logger.info(f"Found {pdf_count} PDFs with extracted data")
             
-            if not pdfs_with_data.exists():
+            if not pdfs_with_data:
                 logger.warning("No PDFs with extracted data found")
                 messages.warning(request, "No processed PDFs found with extracted data")
                 return redirect("dashboard")
@@ -74,9 +90,11 @@ def download_all_pdfs_package(request):
             
             # Step 4: Prepare data for Excel
             logger.info("Preparing data for Excel")
-            all_extraction_data = []
-            field_count = 0
             successful_pdfs = []
+            # Filename, vendor name and path in the package of each copied PDF, by PDF id
+            pdf_files = {}
+            pdf_vendors = {}
+            pdf_paths = {}
             
             # Create a minimal test file to verify file system is working
             test_file_path = os.path.join(package_dir, 'test.txt')
@@ -89,17 +107,22 @@ def download_all_pdfs_package(request):
                 # Continue despite test file failure
             
             # Step 5: Process each PDF with proper error handling
-            logger.info("Processing PDFs")
-            for idx, pdf in enumerate(pdfs_with_data):
+            def copy_pdf(pdf_index, pdf):
+                """
+                Validate and copy one PDF into the package. Runs on a worker
+                thread, so it only touches the file system.
+                
+                Returns (pdf_filename, None) if the PDF was copied, otherwise
+                (None, reason) with the entry for the skipped files list, or
+                (None, None) if it was left out because of an unexpected error.
+                """
                 try:
-                    pdf_index = idx + 1
                     logger.info(f"Processing PDF {pdf_index}/{pdf_count}: ID={pdf.id}")
                     
                     # 5a: Get PDF filename and paths
                     if not hasattr(pdf, 'file') or not pdf.file:
                         logger.warning(f"PDF record {pdf.id} has no file attribute or it's None")
-                        skipped_files.append(f"PDF ID {pdf.id}: No file attribute")
-                        continue
+                        return None, f"PDF ID {pdf.id}: No file attribute"
                     
                     pdf_filename = os.path.basename(pdf.file.name)
                     logger.info(f"PDF filename: {pdf_filename}")
@@ -112,79 +135,59 @@ def download_all_pdfs_package(request):
                         
                         if not os.path.exists(pdf_src_path):
                             logger.warning(f"PDF file not found: {pdf_src_path}")
-                            skipped_files.append(pdf_src_path)
-                            continue
+                            return None, pdf_src_path
                             
                         if not os.access(pdf_src_path, os.R_OK):
                             logger.warning(f"PDF file not readable: {pdf_src_path}")
-                            skipped_files.append(f"{pdf_src_path} (not readable)")
-                            continue
+                            return None, f"{pdf_src_path} (not readable)"
                         
                         # Get file size for debugging
                         file_size = os.path.getsize(pdf_src_path)
                         logger.info(f"PDF file size: {file_size} bytes")
                     except Exception as e:
                         logger.error(f"Error validating PDF file: {str(e)}", exc_info=True)
-                        skipped_files.append(f"PDF ID {pdf.id}: {str(e)}")
-                        continue
+                        return None, f"PDF ID {pdf.id}: {str(e)}"
                     
-                    # 5c: Copy PDF file with buffered I/O
+                    # 5c: Copy PDF file
                     try:
                         logger.info(f"Copying PDF from {pdf_src_path} to {pdf_dst_path}")
-                        # Use buffered I/O with smaller chunks to avoid memory issues
-                        with open(pdf_src_path, 'rb') as src_file:
-                            with open(pdf_dst_path, 'wb') as dst_file:
-                                # Copy in 1MB chunks
-                                chunk_size = 1024 * 1024  # 1MB
-                                while True:
-                                    chunk = src_file.read(chunk_size)
-                                    if not chunk:
-                                        break
-                                    dst_file.write(chunk)
+                        fast_copy_file(pdf_src_path, pdf_dst_path)
                         
                         # Verify the copy was successful
                         if os.path.exists(pdf_dst_path):
                             dest_size = os.path.getsize(pdf_dst_path)
                             logger.info(f"PDF copy successful: {dest_size} bytes")
-                            pdf_success_count += 1
-                            successful_pdfs.append(pdf)
-                        else:
-                            logger.error(f"PDF copy failed: Destination file does not exist")
-                            skipped_files.append(f"{pdf_src_path} (copy failed: destination missing)")
-                            continue
+                            return pdf_filename, None
+                        
+                        logger.error(f"PDF copy failed: Destination file does not exist")
+                        return None, f"{pdf_src_path} (copy failed: destination missing)"
                         
                     except Exception as e:
                         logger.error(f"Failed to copy PDF {pdf_src_path} to {pdf_dst_path}: {str(e)}", exc_info=True)
-                        skipped_files.append(f"{pdf_src_path} (copy failed: {str(e)})")
-                        continue
+                        return None, f"{pdf_src_path} (copy failed: {str(e)})"
                     
-                    # 5d: Get extracted data for this PDF
-                    try:
-                        logger.info(f"Getting extracted data for PDF ID {pdf.id}")
-                        extracted_data = ExtractedData.objects.filter(pdf=pdf).order_by('field_key')
-                        data_count = extracted_data.count()
-                        logger.info(f"Found {data_count} extracted fields")
-                        field_count += data_count
-                        
-                        # Get key fields for this PDF
-                        for item in extracted_data:
-                            all_extraction_data.append({
-                                'Sr No': len(all_extraction_data) + 1,
-                                'PDF File': pdf_filename,
-                                'Vendor': pdf.vendor.name,
-                                'Field Key': item.field_key,
-                                'Field Value': item.field_value,
-                                'Page Number': item.page_number,
-                                'Extracted At': item.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                                'PDF Path': f"pdfs/{pdf_index:03d}_{pdf_filename}"
-                            })
-                    except Exception as e:
-                        logger.error(f"Error processing extracted data for PDF {pdf_filename}: {str(e)}", exc_info=True)
-                        # Continue with next PDF since we already copied this one
-                
                 except Exception as e:
                     logger.error(f"Error processing PDF ID {pdf.id}: {str(e)}", exc_info=True)
+                    return None, None
+            
+            # Copying is I/O bound, so the PDFs are copied on a thread pool. Results
+            # come back in package order, so numbering and skipped files keep their order.
+            logger.info("Processing PDFs")
+            pdf_indexes = range(1, pdf_count + 1)
+            with ThreadPoolExecutor(max_workers=min(PDF_COPY_WORKERS, pdf_count)) as executor:
+                copy_results = list(executor.map(copy_pdf, pdf_indexes, pdfs_with_data))
+            
+            for pdf_index, pdf, (pdf_filename, skip_reason) in zip(pdf_indexes, pdfs_with_data, copy_results):
+                if pdf_filename is None:
+                    if skip_reason is not None:
+                        skipped_files.append(skip_reason)
                     continue
+                
+                pdf_success_count += 1
+                successful_pdfs.append(pdf)
+                pdf_files[pdf.id] = pdf_filename
+                pdf_vendors[pdf.id] = pdf.vendor.name
+                pdf_paths[pdf.id] = f"pdfs/{pdf_index:03d}_{pdf_filename}"
             
             # Step 6: Check if we have any successful PDFs
             logger.info(f"PDF processing complete. Success: {pdf_success_count}/{pdf_count}")
@@ -192,14 +195,64 @@ def download_all_pdfs_package(request):
                 logger.error("No PDFs were successfully processed for the package")
                 messages.error(request, "Could not include any PDF files in the package. Please check file permissions.")
                 return redirect("dashboard")
+
+            # Get extracted data for all copied PDFs in one query, built into
+            # the DataFrame column by column rather than as a dict per row
+            logger.info("Getting extracted data for the included PDFs")
+            extracted_rows = (
+                ExtractedData.objects
+                .filter(pdf_id__in=list(pdf_files))
+                .order_by('field_key', 'id')
+                .values_list('pdf_id', 'field_key', 'field_value', 'page_number', 'created_at')
+            )
+            extracted_df = pd.DataFrame.from_records(
+                extracted_rows, columns=['pdf_id', 'Field Key', 'Field Value', 'Page Number', 'created_at']
+            )
+            # Rows are grouped by PDF in package order, by field key within each PDF
+            pdf_positions = {pdf_id: position for position, pdf_id in enumerate(pdf_files)}
+            extracted_df = extracted_df.iloc[
+                extracted_df['pdf_id'].map(pdf_positions).to_numpy().argsort(kind='stable')
+            ]
+            pdf_ids = extracted_df['pdf_id']
+            all_extraction_data = pd.DataFrame({
+                'Sr No': np.arange(1, len(extracted_df) + 1),
+                'PDF File': pdf_ids.map(pdf_files).to_numpy(),
+                'Vendor': pdf_ids.map(pdf_vendors).to_numpy(),
+                'Field Key': extracted_df['Field Key'].to_numpy(),
+                'Field Value': extracted_df['Field Value'].to_numpy(),
+                'Page Number': extracted_df['Page Number'].to_numpy(),
+                'Extracted At': pd.to_datetime(extracted_df['created_at']).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(),
+                'PDF Path': pdf_ids.map(pdf_paths).to_numpy(),
+            })
+            field_count = len(all_extraction_data)
+            fields_found = extracted_df['pdf_id'].value_counts()
+            
+            # Key field values of each PDF, {pdf_id: {field_key: value}}, pivoted
+            # from the rows above. Like ExtractedData's default ordering, the
+            # most recently extracted value of each field is used.
+            key_field_values = (
+                extracted_df[extracted_df['Field Key'].isin(FIELD_KEYS)]
+                .sort_values('created_at', ascending=False, kind='stable')
+                .drop_duplicates(['pdf_id', 'Field Key'])
+                .pivot(index='pdf_id', columns='Field Key', values='Field Value')
+                .fillna('')
+                .to_dict('index')
+            )
+            logger.info(f"Found {field_count} extracted fields")
             
             # Create a minimal text file with extracted data as a fallback
             fallback_text_path = os.path.join(package_dir, 'extracted_data.txt')
             try:
                 with open(fallback_text_path, 'w') as f:
                     f.write(f"Extracted data from {pdf_count} PDFs\n\n")
-                    for item in all_extraction_data:
-                        f.write(f"PDF: {item['PDF File']}, Field: {item['Field Key']}, Value: {item['Field Value']}\n")
+                    f.writelines(
+                        f"PDF: {pdf_file}, Field: {field_key}, Value: {field_value}\n"
+                        for pdf_file, field_key, field_value in zip(
+                            all_extraction_data['PDF File'],
+                            all_extraction_data['Field Key'],
+                            all_extraction_data['Field Value'],
+                        )
+                    )
                 logger.info(f"Created fallback text file: {fallback_text_path}")
             except Exception as e:
                 logger.error(f"Failed to create fallback text file: {str(e)}", exc_info=True)
@@ -218,7 +271,7 @@ def download_all_pdfs_package(request):
                 test_df = pd.DataFrame({'Test': ['This is a test']})
                 
                 # Try multiple engines in case one fails
-                excel_engines = ['openpyxl', 'xlsxwriter']
+                excel_engines = ['xlsxwriter', 'openpyxl']
                 excel_engine_success = False
                 
                 for engine in excel_engines:
@@ -252,75 +305,68 @@ def download_all_pdfs_package(request):
                 
                 # Now create the real Excel file with the successful engine
                 logger.info(f"Creating main Excel file using {excel_engine} engine: {excel_path}")
-                with pd.ExcelWriter(excel_path, engine=excel_engine) as writer:
-                    # Create Summary sheet
-                    summary_data = {
-                        'Information': [
-                            'Total PDFs', 'Successfully Included PDFs', 'Total Extracted Fields', 
-                            'Generation Date', 'Package Type', 'Skipped Files'
-                        ],
-                        'Value': [
-                            pdf_count, pdf_success_count, field_count,
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'Complete PDF Package',
-                            len(skipped_files)
-                        ]
-                    }
-                    pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    # Create All extracted data sheet
-                    if all_extraction_data:
-                        df = pd.DataFrame(all_extraction_data)
-                        df.to_excel(writer, sheet_name='All Extracted Data', index=False)
-                    else:
-                        # Create empty sheet with headers if no data
-                        empty_df = pd.DataFrame(columns=[
-                            'Sr No', 'PDF File', 'Vendor', 'Field Key', 'Field Value', 
-                            'Page Number', 'Extracted At', 'PDF Path'
-                        ])
-                        empty_df.to_excel(writer, sheet_name='All Extracted Data', index=False)
-                    
-                    # Create Key fields sheet
-                    key_fields_data = []
-                    for idx, pdf in enumerate(successful_pdfs):
-                        try:
-                            pdf_filename = os.path.basename(pdf.file.name)
-                            extracted = ExtractedData.objects.filter(pdf=pdf)
-                            
-                            # Get values for key fields
-                            field_values = {}
-                            for field in ['PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO']:
-                                matches = [item for item in extracted if item.field_key == field]
-                                field_values[field] = matches[0].field_value if matches else ''
-                            
-                            pdf_index = idx + 1
-                            key_fields_data.append({
-                                'PDF File': pdf_filename,
-                                'Vendor': pdf.vendor.name,
-                                'PLATE_NO': field_values.get('PLATE_NO', ''),
-                                'HEAT_NO': field_values.get('HEAT_NO', ''),
-                                'TEST_CERT_NO': field_values.get('TEST_CERT_NO', ''),
-                                'Fields Found': extracted.count(),
-                                'Uploaded At': pdf.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                                'PDF Path': f"pdfs/{pdf_index:03d}_{pdf_filename}"
-                            })
-                        except Exception as e:
-                            logger.error(f"Error adding key fields data for PDF {pdf.id}: {str(e)}", exc_info=True)
-                            continue
-                    
-                    if key_fields_data:
-                        pd.DataFrame(key_fields_data).to_excel(writer, sheet_name='Key Fields Summary', index=False)
-                    else:
-                        empty_df = pd.DataFrame(columns=[
-                            'PDF File', 'Vendor', 'PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO',
-                            'Fields Found', 'Uploaded At', 'PDF Path'
-                        ])
-                        empty_df.to_excel(writer, sheet_name='Key Fields Summary', index=False)
-                    
-                    # Create Skipped files sheet
-                    if skipped_files:
-                        skipped_df = pd.DataFrame({'Skipped Files': skipped_files})
-                        skipped_df.to_excel(writer, sheet_name='Skipped Files', index=False)
+                
+                # Create Summary sheet
+                summary_data = {
+                    'Information': [
+                        'Total PDFs', 'Successfully Included PDFs', 'Total Extracted Fields', 
+                        'Generation Date', 'Package Type', 'Skipped Files'
+                    ],
+                    'Value': [
+                        pdf_count, pdf_success_count, field_count,
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        'Complete PDF Package',
+                        len(skipped_files)
+                    ]
+                }
+                excel_sheets = {'Summary': pd.DataFrame(summary_data)}
+                
+                # Create All extracted data sheet; an empty frame still writes the headers
+                excel_sheets['All Extracted Data'] = all_extraction_data
+                
+                # Create Key fields sheet
+                key_fields_data = []
+                for idx, pdf in enumerate(successful_pdfs):
+                    try:
+                        pdf_filename = os.path.basename(pdf.file.name)
+                        
+                        # Get values for key fields
+                        field_values = key_field_values.get(pdf.id, {})
+                        
+                        pdf_index = idx + 1
+                        key_fields_data.append({
+                            'PDF File': pdf_filename,
+                            'Vendor': pdf.vendor.name,
+                            'PLATE_NO': field_values.get('PLATE_NO', ''),
+                            'HEAT_NO': field_values.get('HEAT_NO', ''),
+                            'TEST_CERT_NO': field_values.get('TEST_CERT_NO', ''),
+                            'Fields Found': fields_found.get(pdf.id, 0),
+                            'Uploaded At': pdf.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
+                            'PDF Path': f"pdfs/{pdf_index:03d}_{pdf_filename}"
+                        })
+                    except Exception as e:
+                        logger.error(f"Error adding key fields data for PDF {pdf.id}: {str(e)}", exc_info=True)
+                        continue
+                
+                if key_fields_data:
+                    excel_sheets['Key Fields Summary'] = pd.DataFrame(key_fields_data)
+                else:
+                    excel_sheets['Key Fields Summary'] = pd.DataFrame(columns=[
+                        'PDF File', 'Vendor', 'PLATE_NO', 'HEAT_NO', 'TEST_CERT_NO',
+                        'Fields Found', 'Uploaded At', 'PDF Path'
+                    ])
+                
+                # Create Skipped files sheet
+                if skipped_files:
+                    excel_sheets['Skipped Files'] = pd.DataFrame({'Skipped Files': skipped_files})
+                
+                if excel_engine == 'xlsxwriter':
+                    # Rows are streamed to disk as they are written
+                    write_frames_to_xlsx(excel_path, excel_sheets)
+                else:
+                    with pd.ExcelWriter(excel_path, engine=excel_engine) as writer:
+                        for sheet_name, sheet_df in excel_sheets.items():
+                            sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
                 # Verify Excel file was created
                 if os.path.exists(excel_path) and os.path.getsize(excel_path) > 0:
@@ -333,8 +379,8 @@ def download_all_pdfs_package(request):
                     # Create a CSV backup if Excel failed
                     csv_path = os.path.join(package_dir, 'all_extracted_data.csv')
                     
-                    if all_extraction_data:
-                        pd.DataFrame(all_extraction_data).to_csv(csv_path, index=False)
+                    if not all_extraction_data.empty:
+                        all_extraction_data.to_csv(csv_path, index=False)
                         logger.info("Created CSV fallback file for extracted data")
                 
             except Exception as e:
@@ -361,9 +407,9 @@ def download_all_pdfs_package(request):
                     pd.DataFrame(summary_data).to_csv(summary_csv, index=False)
                     
                     # All data CSV
-                    if all_extraction_data:
+                    if not all_extraction_data.empty:
                         all_data_csv = os.path.join(package_dir, 'all_extracted_data.csv')
-                        pd.DataFrame(all_extraction_data).to_csv(all_data_csv, index=False)
+                        all_extraction_data.to_csv(all_data_csv, index=False)
                     
                     logger.info("Created CSV fallback files successfully")
                 except Exception as e2:
@@ -381,7 +427,7 @@ def download_all_pdfs_package(request):
                         f.write(f"Total Fields: {field_count}\n\n")
                         
                         f.write("## Extracted Fields\n\n")
-                        for item in all_extraction_data:
+                        for item in all_extraction_data.to_dict('records'):
                             f.write(f"PDF: {item['PDF File']}\n")
                             f.write(f"Vendor: {item['Vendor']}\n")
                             f.write(f"Field: {item['Field Key']}\n")
@@ -439,71 +485,12 @@ to the corresponding PDF file in this package.
                 logger.error(f"Error creating README file: {str(e)}", exc_info=True)
                 # Continue even if README creation fails
             
-            # Step 9: Create ZIP file
+            # Step 9: Stream the ZIP file while it is built, instead of building
+            # it in memory first. The temporary directory is removed when the
+            # response is closed, even if it was never streamed.
             logger.info("Creating ZIP file")
             zip_filename = f"complete_pdf_package_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-            
-            # Create a fallback minimal ZIP if everything else fails
-            fallback_zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(fallback_zip_buffer, 'w', zipfile.ZIP_DEFLATED) as fallback_zipf:
-                fallback_readme = "# Error creating full PDF package\n\nThere was an error creating the complete PDF package. Please contact support."
-                fallback_zipf.writestr("README.txt", fallback_readme)
-            fallback_zip_buffer.seek(0)
-            
-            # Try to create the real ZIP
-            zip_buffer = io.BytesIO()
-            zip_success = False
-            
-            try:
-                logger.info("Opening ZIP file")
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # First, add all files in the package directory
-                    files_added = 0
-                    for root, dirs, files in os.walk(package_dir):
-                        for file in files:
-                            try:
-                                file_path = os.path.join(root, file)
-                                
-                                # Skip files that don't exist or aren't readable
-                                if not os.path.exists(file_path):
-                                    logger.warning(f"File does not exist when creating ZIP: {file_path}")
-                                    continue
-                                    
-                                if not os.access(file_path, os.R_OK):
-                                    logger.warning(f"File not readable when creating ZIP: {file_path}")
-                                    continue
-                                
-                                arcname = os.path.relpath(file_path, package_dir)
-                                zipf.write(file_path, arcname=arcname)
-                                files_added += 1
-                                logger.info(f"Added to ZIP: {arcname}")
-                            except Exception as e:
-                                logger.error(f"Error adding file {file} to ZIP: {str(e)}", exc_info=True)
-                                continue
-                    
-                    logger.info(f"Added {files_added} files to ZIP")
-                
-                # Check if ZIP was created successfully
-                zip_buffer.seek(0, os.SEEK_END)
-                zip_size = zip_buffer.tell()
-                zip_buffer.seek(0)
-                
-                if zip_size > 0:
-                    logger.info(f"ZIP created successfully: {zip_size} bytes")
-                    zip_success = True
-                else:
-                    logger.error("ZIP creation failed: zero bytes")
-                
-            except Exception as e:
-                logger.error(f"Error creating ZIP file: {str(e)}", exc_info=True)
-            
-            # Step 10: Return ZIP as response
-            if not zip_success:
-                logger.warning("Using fallback ZIP due to creation failure")
-                zip_buffer = fallback_zip_buffer
-            
-            # Reset buffer position and create response
-            zip_buffer.seek(0)
+            zip_stream = ClosingStream(stream_directory(package_dir), cleanup.pop_all().close)
             
             # Log summary of ZIP creation
             log_message = (
@@ -520,11 +507,9 @@ to the corresponding PDF file in this package.
                 success_msg = f"ZIP package created successfully with {pdf_success_count} PDFs."
                 messages.success(request, success_msg)
             
-            # Use FileResponse since our test proved it works
-            response = FileResponse(zip_buffer, as_attachment=True, filename=zip_filename)
-            
-            # Set content type explicitly
-            response['Content-Type'] = 'application/zip'
+            # Step 10: Return ZIP as response; the size isn't known up front,
+            # so no Content-Length is sent
+            response = StreamingHttpResponse(zip_stream, content_type='application/zip')
             
             # Set content disposition with proper filename
             response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
@@ -602,7 +587,7 @@ def download_package_api(request, file_id):
             if hasattr(pdf, 'file') and pdf.file and os.path.exists(pdf.file.path):
                 try:
                     original_pdf_path = os.path.join(output_dir, f'original_{pdf_filename}')
-                    shutil.copy2(pdf.file.path, original_pdf_path)
+                    fast_copy_file(pdf.file.path, original_pdf_path, keep_times=True)
                     files_added += 1
                 except Exception as e:
                     logger.warning(f"Could not copy original PDF: {str(e)}")
@@ -617,7 +602,7 @@ def download_package_api(request, file_id):
                             src_path = os.path.join(root, file)
                             dest_path = os.path.join(output_dir, file)
                             try:
-                                shutil.copy2(src_path, dest_path)
+                                fast_copy_file(src_path, dest_path, keep_times=True)
                                 files_added += 1
                             except Exception as e:
                                 logger.warning(f"Could not copy extracted file {file}: {str(e)}")
@@ -669,7 +654,7 @@ All files are organized in the outputs/{file_id}/ structure as requested.
             zip_buffer = io.BytesIO()
             
             try:
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=PACKAGE_COMPRESSION_LEVEL) as zipf:
                     # Add all files from the outputs directory structure
                     outputs_base = os.path.join(temp_dir, 'outputs')
                     for root, dirs, files in os.walk(outputs_base):
@@ -677,7 +662,11 @@ All files are organized in the outputs/{file_id}/ structure as requested.
                             file_path = os.path.join(root, file)
                             # Preserve the outputs/<file_id>/ structure in the ZIP
                             arcname = os.path.relpath(file_path, temp_dir)
-                            zipf.write(file_path, arcname=arcname)
+                            # PDFs are already compressed, so they are stored as-is
+                            if file.lower().endswith(STORED_EXTENSIONS):
+                                copy_into_zip(zipf, file_path, arcname)
+                            else:
+                                zipf.write(file_path, arcname=arcname)
                 
                 zip_buffer.seek(0)
                 
@@ -188,6 +188,12 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Set USE_X_ACCEL_REDIRECT=1 when nginx serves MEDIA_ROOT as an internal
+# location at X_ACCEL_REDIRECT_PREFIX; large downloads are then handed to
+# nginx instead of being streamed by the Django worker
+USE_X_ACCEL_REDIRECT = os.getenv('USE_X_ACCEL_REDIRECT', '') == '1'
+X_ACCEL_REDIRECT_PREFIX = os.getenv('X_ACCEL_REDIRECT_PREFIX', '/protected/media/')
+
 # Define vendor configs directory
 VENDOR_CONFIGS_DIR = BASE_DIR / 'media' / 'vendor_configs'
 
@@ -207,6 +213,29 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+
+# Redis used for shared state outside Celery (e.g. the master Excel page map)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+
+# Sessions are cached in Redis and only read from the database on a cache
+# miss; the default cache stays in-process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': {
+            'socket_connect_timeout': 1,
+            'socket_timeout': 1,
+        },
+    },
+}
+# Cached database sessions; the database is used alone while Redis is unreachable
+SESSION_ENGINE = 'extractor.session_store'
+SESSION_CACHE_ALIAS = 'sessions'
+
 # Updated TEMPLATES setting
 TEMPLATES = [
     {
@@ -3,11 +3,12 @@ This script updates the page numbers in the master Excel file by extracting them
 It reads the extract_multi_entries log file to find the correct page numbers for each entry.
 """
 import os
-import pandas as pd
 import re
 import json
+import shutil
 import logging
 from datetime import datetime
+from openpyxl import load_workbook
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -33,8 +34,9 @@ def update_excel_with_pages():
         # Read the Excel file
         logger.info(f"Reading Excel file: {excel_path}")
         try:
-            df = pd.read_excel(excel_path)
-            logger.info(f"Successfully read Excel file with {len(df)} rows")
+            wb = load_workbook(excel_path)
+            ws = wb.worksheets[0]
+            logger.info(f"Successfully read Excel file with {ws.max_row - 1} rows")
         except Exception as e:
             logger.error(f"Error reading Excel file: {e}")
             return False
@@ -67,16 +69,25 @@ def update_excel_with_pages():
         
         logger.info(f"Found {entry_count} entries with page information in logs")
         
-        # Update the Excel file with page numbers
+        # Update the Excel file with page numbers, cell by cell in place
+        headers = [cell.value for cell in ws[1]]
+        try:
+            plate_col = headers.index('PLATE_NO')
+            heat_col = headers.index('HEAT_NO')
+            cert_col = headers.index('TEST_CERT_NO')
+            page_col = headers.index('Page')
+        except ValueError as e:
+            logger.error(f"Excel file is missing a required column: {e}")
+            return False
+        
         updated_count = 0
-        for i, row in df.iterrows():
-            key = (
-                str(row.get('PLATE_NO', '')),
-                str(row.get('HEAT_NO', '')),
-                str(row.get('TEST_CERT_NO', ''))
+        for row in ws.iter_rows(min_row=2):
+            key = tuple(
+                '' if row[col].value is None else str(row[col].value)
+                for col in (plate_col, heat_col, cert_col)
             )
             if key in page_info:
-                df.at[i, 'Page'] = page_info[key]
+                row[page_col].value = page_info[key]
                 updated_count += 1
         
         logger.info(f"Updated {updated_count} rows with correct page numbers")
@@ -87,15 +98,14 @@ def update_excel_with_pages():
         
         # Create a backup of the original file
         try:
-            df_original = pd.read_excel(excel_path)
-            df_original.to_excel(backup_path, index=False)
+            shutil.copyfile(excel_path, backup_path)
             logger.info(f"Created backup of original Excel file: {backup_path}")
         except Exception as e:
             logger.warning(f"Could not create backup: {e}")
         
         # Save the updated file
         try:
-            df.to_excel(excel_path, index=False)
+            wb.save(excel_path)
             logger.info(f"Successfully saved updated Excel file with page numbers")
             return True
         except Exception as e: